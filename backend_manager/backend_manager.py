@@ -6,19 +6,35 @@ a TOML-formatted parameter in the store.
 """
 
 import logging
+import threading
+import time
 import tomllib
 from dataclasses import dataclass
 from typing import Any
 
 import boto3
 from botocore.client import ClientError
+from botocore.config import Config
 from pb.mqc3_cloud.scheduler.v1 import submission_pb2
 from utility import AWSCredentials
 
+try:
+    # `rtoml` is an optional, faster drop-in for decoding TOML. Fall back to the standard library otherwise.
+    import rtoml as _toml_decoder
+except ImportError:
+    _toml_decoder = tomllib
+
 logger = logging.getLogger(__name__)
 
+_SERVICE_STATUS_UNAVAILABLE = submission_pb2.ServiceStatus.SERVICE_STATUS_UNAVAILABLE
+_SERVICE_STATUS_MAP: dict[str, submission_pb2.ServiceStatus] = {
+    "available": submission_pb2.ServiceStatus.SERVICE_STATUS_AVAILABLE,
+    "maintenance": submission_pb2.ServiceStatus.SERVICE_STATUS_MAINTENANCE,
+    "unavailable": _SERVICE_STATUS_UNAVAILABLE,
+}
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BackendAvailability:
     """Represents the availability state of a backend for a specific user role."""
 
@@ -38,19 +54,16 @@ class BackendManager:
 
     @staticmethod
     def _parse_toml(toml_str: str) -> dict[str, Any]:
-        return tomllib.loads(toml_str)
+        return _toml_decoder.loads(toml_str)
 
     @staticmethod
     def _to_service_status(status: str) -> submission_pb2.ServiceStatus:
-        if status == "available":
-            return submission_pb2.ServiceStatus.SERVICE_STATUS_AVAILABLE
-        if status == "maintenance":
-            return submission_pb2.ServiceStatus.SERVICE_STATUS_MAINTENANCE
-        if status == "unavailable":
-            return submission_pb2.ServiceStatus.SERVICE_STATUS_UNAVAILABLE
+        service_status = _SERVICE_STATUS_MAP.get(status)
+        if service_status is not None:
+            return service_status
 
         logger.error("Invalid status string '%s'. Falling back to 'unavailable'.", status)
-        return submission_pb2.ServiceStatus.SERVICE_STATUS_UNAVAILABLE
+        return _SERVICE_STATUS_UNAVAILABLE
 
     def __init__(
         self,
@@ -58,6 +71,8 @@ class BackendManager:
         aws_credentials: AWSCredentials,
         *,
         unify_backends: bool = False,
+        status_cache_ttl_seconds: float = 10.0,
+        background_refresh: bool = False,
     ) -> None:
         """Initialize the backend manager.
 
@@ -65,6 +80,11 @@ class BackendManager:
             status_parameter_name (str): Name of the parameter in AWS SSM Parameter Store.
             aws_credentials (AWSCredentials): AWS credentials for accessing the SSM Parameter Store.
             unify_backends (bool): Whether to merge the backends from the status parameter with `all`.
+            status_cache_ttl_seconds (float): Time in seconds to reuse the parsed status parameter
+                before retrieving it from SSM again. Caching (including the fallback to an expired status
+                on errors) is disabled if this is zero or less.
+            background_refresh (bool): Whether to refresh the cached status in a background thread
+                before it expires so that requests do not wait for SSM. Ignored if caching is disabled.
 
         Raises:
             RuntimeError: If failed to initialize the status parameter.
@@ -76,19 +96,49 @@ class BackendManager:
             endpoint_url=aws_credentials.endpoint_url,
             aws_access_key_id=aws_credentials.access_key_id,
             aws_secret_access_key=aws_credentials.secret_access_key,
+            config=Config(
+                max_pool_connections=50,
+                tcp_keepalive=True,
+                # Adaptive retries back off client-side when SSM throttles `GetParameter`.
+                retries={"max_attempts": 5, "mode": "adaptive"},
+            ),
         )
         self.unify_backends = unify_backends
 
+        self.status_cache_ttl_seconds = status_cache_ttl_seconds
+        # Pair of the monotonic time when the status was loaded and the parsed status.
+        # It is only ever replaced as a whole, so readers need no lock.
+        self._status_cache: tuple[float, dict[str, Any]] | None = None
+        self._status_cache_lock = threading.Lock()
+
         # Validate the status parameter.
         status_toml = self._get_status_toml()
         if status_toml is None:
             msg = "Failed to retrieve the status parameter."
             raise RuntimeError(msg)
         try:
-            self._parse_toml(toml_str=status_toml)
+            backend_status = self._parse_toml(toml_str=status_toml)
         except Exception as e:
             msg = "Failed to validate the status parameter."
             raise RuntimeError(msg) from e
+        # Reuse the validated status for the first requests.
+        if self.status_cache_ttl_seconds > 0:
+            self._status_cache = (time.monotonic(), backend_status)
+
+        self._stop_refresh_event = threading.Event()
+        self._refresh_thread: threading.Thread | None = None
+        if background_refresh and self.status_cache_ttl_seconds > 0:
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_backend_status_periodically, name="backend-status-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+
+    def stop_background_refresh(self) -> None:
+        """Stop the background thread refreshing the backend status, if it is running."""
+        self._stop_refresh_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join()
+            self._refresh_thread = None
 
     def _get_status_toml(self) -> str | None:
         """Read the backend status parameter from the parameter store.
@@ -110,21 +160,70 @@ class BackendManager:
                 return None
             raise
 
+    def _get_cached_backend_status(self) -> dict[str, Any] | None:
+        """Return the cached backend status if it has not expired.
+
+        Returns:
+            dict[str, Any] | None: The cached backend status, or None if there is no valid cache.
+        """
+        status_cache = self._status_cache
+        if status_cache is not None and time.monotonic() - status_cache[0] < self.status_cache_ttl_seconds:
+            return status_cache[1]
+        return None
+
     def _load_backend_status(self) -> dict[str, Any] | None:
         """Retrieve the backend status from AWS SSM Parameter Store.
 
+        The parsed status is cached for `status_cache_ttl_seconds`. When the cache expires, only one caller
+        refreshes it while concurrent callers wait for the result. If the refresh fails, the expired status
+        is returned instead so that a transient SSM error does not make the backends unavailable.
+
         Returns:
             dict[str, Any] | None: The backend status as a dictionary, or None if an error occurs.
         """
+        backend_status = self._get_cached_backend_status()
+        if backend_status is not None:
+            return backend_status
+
+        with self._status_cache_lock:
+            # The cache may have been refreshed by another caller while waiting for the lock.
+            backend_status = self._get_cached_backend_status()
+            if backend_status is not None:
+                return backend_status
+
+            return self._refresh_backend_status()
+
+    def _refresh_backend_status(self) -> dict[str, Any] | None:
+        """Retrieve the backend status from SSM and update the cache.
+
+        The caller must hold `_status_cache_lock`.
+
+        Returns:
+            dict[str, Any] | None: The backend status, the expired status if the retrieval fails,
+                or None if there is no status to return.
+        """
         try:
             status_toml = self._get_status_toml()
             if status_toml is None:
                 return None
-            return self._parse_toml(status_toml)
+            backend_status = self._parse_toml(status_toml)
         except Exception:
             logger.exception("Failed to load the backend status.")
+            if self._status_cache is not None:
+                logger.warning("Using the expired backend status.")
+                return self._status_cache[1]
             return None
 
+        if self.status_cache_ttl_seconds > 0:
+            self._status_cache = (time.monotonic(), backend_status)
+        return backend_status
+
+    def _refresh_backend_status_periodically(self) -> None:
+        """Refresh the cached backend status at half the TTL until stopped."""
+        while not self._stop_refresh_event.wait(self.status_cache_ttl_seconds / 2):
+            with self._status_cache_lock:
+                self._refresh_backend_status()
+
     def get_backend_availability(self, backend: str, role: str) -> BackendAvailability:
         """Retrieve availability status for the specified backend and user role.
 
@@ -143,7 +242,7 @@ class BackendManager:
             return BackendAvailability(
                 backend=backend,
                 role=role,
-                status=self._to_service_status("unavailable"),
+                status=_SERVICE_STATUS_UNAVAILABLE,
                 description="Failed to load the backend status.",
             )
 
@@ -155,7 +254,7 @@ class BackendManager:
             return BackendAvailability(
                 backend=backend,
                 role=role,
-                status=self._to_service_status("unavailable"),
+                status=_SERVICE_STATUS_UNAVAILABLE,
                 description="Status data is corrupted or invalid.",
             )
 
@@ -186,7 +285,7 @@ class BackendManager:
             return BackendAvailability(
                 backend=backend,
                 role=role,
-                status=self._to_service_status("unavailable"),
+                status=_SERVICE_STATUS_UNAVAILABLE,
                 description="Status data is corrupted or invalid.",
             )
 
@@ -1,7 +1,13 @@
 """get token information from database."""
 
+import atexit
+import json
 import logging
-from dataclasses import dataclass
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -10,31 +16,282 @@ from pb.mqc3_cloud.token_database.v1 import token_database_pb2, token_database_p
 
 logger = logging.getLogger(__name__)
 
+# Channels to the token database are shared across calls so that each lookup reuses an established connection.
+_channels: dict[str, tuple[grpc.Channel, token_database_pb2_grpc.TokenDatabaseServiceStub]] = {}
+_channels_lock = threading.Lock()
+TOKEN_DATABASE_TIMEOUT_SECONDS = float(os.getenv("SCHEDULER_TOKEN_DATABASE_TIMEOUT_SECONDS", "1.0"))
+# Lookups are read-only, so retrying them on `UNAVAILABLE` is safe.
+_RETRY_SERVICE_CONFIG = {
+    "methodConfig": [
+        {
+            "name": [{"service": "mqc3_cloud.token_database.v1.TokenDatabaseService"}],
+            "retryPolicy": {
+                "maxAttempts": 3,
+                "initialBackoff": "0.05s",
+                "maxBackoff": "0.5s",
+                "backoffMultiplier": 2,
+                "retryableStatusCodes": ["UNAVAILABLE"],
+            },
+        }
+    ]
+}
+_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.enable_retries", 1),
+    ("grpc.service_config", json.dumps(_RETRY_SERVICE_CONFIG)),
+]
+_CALL_METADATA = (("x-client", "scheduler"),)
 
-@dataclass
+_STATUS_OK = token_database_pb2.DatabaseOperationStatus.DATABASE_OPERATION_STATUS_OK
+_STATUS_NOT_FOUND = token_database_pb2.DatabaseOperationStatus.DATABASE_OPERATION_STATUS_NOT_FOUND
+_STATUS_UNSPECIFIED = token_database_pb2.DatabaseOperationStatus.DATABASE_OPERATION_STATUS_UNSPECIFIED
+_TOKYO = ZoneInfo("Asia/Tokyo")
+
+TOKEN_INFO_CACHE_TTL_SECONDS = float(os.getenv("SCHEDULER_TOKEN_INFO_CACHE_TTL_SECONDS", "60"))
+# A token looked up just before it is issued is rejected until its not-found result expires from the cache.
+TOKEN_INFO_NEGATIVE_CACHE_TTL_SECONDS = float(os.getenv("SCHEDULER_TOKEN_INFO_NEGATIVE_CACHE_TTL_SECONDS", "5"))
+TOKEN_INFO_CACHE_MAX_ENTRIES = 10_000
+# Seconds until a cache entry past half of its TTL is refreshed again after starting a refresh, so that callers do
+# not start a failing refresh on every cache hit while the token database is unavailable.
+TOKEN_INFO_REFRESH_BACKOFF_SECONDS = 5.0
+
+# Mapping from (address, token) to the monotonic time after which the entry is refreshed in the background,
+# the monotonic time until which the entry is valid, and the looked-up token info.
+_token_info_cache: dict[tuple[str, str], tuple[float, float, "TokenInfo | None"]] = {}
+_token_info_cache_lock = threading.Lock()
+# Lookups in flight keyed like the cache. Concurrent callers missing the cache for the same token wait for
+# the lookup that is already running instead of sending their own.
+_inflight_lookups: dict[tuple[str, str], Future] = {}
+_inflight_lookups_lock = threading.Lock()
+# Refreshes cache entries past half of their TTL, so that callers keep hitting the cache for tokens in use.
+# It is created on the first refresh and never again once shut down at exit.
+_refresh_executor: ThreadPoolExecutor | None = None
+_refresh_executor_closed = False
+_refresh_executor_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
 class TokenInfo:
     """Token information."""
 
     role: str
     name: str
     expires_at: datetime | None
+    # POSIX timestamp of `expires_at`, precomputed so that expiry checks are a float comparison.
+    expires_at_ts: float | None = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Precompute the timestamp of the expiry."""
+        object.__setattr__(self, "expires_at_ts", None if self.expires_at is None else self.expires_at.timestamp())
 
     def is_expired(self, dt: datetime) -> bool:
         """Check if the token is expired.
 
+        Args:
+            dt (datetime): datetime to check the expiry against
+
+        Returns:
+            bool: True if the token is expired
+        """
+        return self.is_expired_at(dt.timestamp())
+
+    def is_expired_at(self, timestamp: float) -> bool:
+        """Check if the token is expired at a POSIX timestamp, without constructing a datetime.
+
+        Args:
+            timestamp (float): POSIX timestamp to check the expiry against
+
         Returns:
             bool: True if the token is expired
         """
-        return self.expires_at is not None and self.expires_at < dt
+        return self.expires_at_ts is not None and self.expires_at_ts < timestamp
 
 
 class TokenDatabaseError(Exception):
     """Unknown error from token database."""
 
 
+def _get_token_database_stub(address_to_token_database: str) -> token_database_pb2_grpc.TokenDatabaseServiceStub:
+    """Get a stub to the token database, opening a channel only on the first call for the address.
+
+    Args:
+        address_to_token_database (str): address to token database
+
+    Returns:
+        token_database_pb2_grpc.TokenDatabaseServiceStub: stub bound to the shared channel
+    """
+    with _channels_lock:
+        if address_to_token_database not in _channels:
+            channel = grpc.insecure_channel(address_to_token_database, options=_CHANNEL_OPTIONS)
+            _channels[address_to_token_database] = (channel, token_database_pb2_grpc.TokenDatabaseServiceStub(channel))
+        return _channels[address_to_token_database][1]
+
+
+def _get_cached_token_info(key: tuple[str, str]) -> tuple[bool, TokenInfo | None]:
+    """Look up a token info cached by a previous call.
+
+    An entry past half of its TTL is returned as is and refreshed in the background.
+
+    Args:
+        key (tuple[str, str]): pair of address to token database and user token
+
+    Returns:
+        tuple[bool, TokenInfo | None]: whether a valid entry was found and the cached token info
+    """
+    # A single `dict.get` is atomic, so hits are served without taking the lock.
+    entry = _token_info_cache.get(key)
+    if entry is None:
+        return False, None
+    refresh_at, cached_until, token_info = entry
+    now = time.monotonic()
+    if now >= cached_until:
+        with _token_info_cache_lock:
+            # Another thread may have replaced the expired entry in the meantime.
+            if _token_info_cache.get(key) is entry:
+                del _token_info_cache[key]
+        return False, None
+    if now >= refresh_at:
+        with _token_info_cache_lock:
+            # Only the caller replacing the entry starts the refresh. A successful refresh replaces the entry again.
+            postponed = _token_info_cache.get(key) is entry
+            if postponed:
+                next_refresh_at = min(now + TOKEN_INFO_REFRESH_BACKOFF_SECONDS, cached_until)
+                _token_info_cache[key] = (next_refresh_at, cached_until, token_info)
+        if postponed:
+            _start_lookup(key, background=True)
+    return True, token_info
+
+
+def _cache_token_info(key: tuple[str, str], token_info: TokenInfo | None) -> None:
+    """Cache a token info, never beyond the expiry of the token.
+
+    Args:
+        key (tuple[str, str]): pair of address to token database and user token
+        token_info (TokenInfo | None): token information or None if not found
+    """
+    if token_info is None:
+        ttl = TOKEN_INFO_NEGATIVE_CACHE_TTL_SECONDS
+    else:
+        ttl = TOKEN_INFO_CACHE_TTL_SECONDS
+        if token_info.expires_at_ts is not None:
+            ttl = min(ttl, token_info.expires_at_ts - time.time())
+    if ttl <= 0:
+        return
+
+    now = time.monotonic()
+    with _token_info_cache_lock:
+        if key not in _token_info_cache and len(_token_info_cache) >= TOKEN_INFO_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry.
+            del _token_info_cache[next(iter(_token_info_cache))]
+        _token_info_cache[key] = (now + ttl / 2, now + ttl, token_info)
+
+
+def _start_lookup(key: tuple[str, str], *, background: bool) -> tuple[Future, bool]:
+    """Start a lookup of a token unless one is already in flight.
+
+    Args:
+        key (tuple[str, str]): pair of address to token database and user token
+        background (bool): whether to run a started lookup in `_refresh_executor` instead of the caller
+
+    Returns:
+        tuple[Future, bool]: the future of the lookup in flight and whether the caller must run it
+    """
+    with _inflight_lookups_lock:
+        future = _inflight_lookups.get(key)
+        if future is not None:
+            return future, False
+        future = Future()
+        _inflight_lookups[key] = future
+
+    if not background:
+        return future, True
+    try:
+        _get_refresh_executor().submit(_run_lookup, key, future)
+    except RuntimeError:
+        # The executor has been shut down at exit. Callers waiting for the lookup get an error rather than
+        # a result that reads as a token that is not found.
+        _finish_lookup(key, future, TokenDatabaseError("Failed to refresh token info."))
+    return future, False
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    """Get the executor of background refreshes, creating it on the first call.
+
+    Raises:
+        RuntimeError: the executor has been shut down at exit
+
+    Returns:
+        ThreadPoolExecutor: executor of background refreshes
+    """
+    global _refresh_executor  # noqa: PLW0603
+    with _refresh_executor_lock:
+        if _refresh_executor_closed:
+            msg = "The executor of token info refreshes has been shut down."
+            raise RuntimeError(msg)
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="token-info-refresh")
+        return _refresh_executor
+
+
+def _run_lookup(key: tuple[str, str], future: Future) -> TokenInfo | None:
+    """Run a lookup started by `_start_lookup` and publish its result to the waiting callers.
+
+    Args:
+        key (tuple[str, str]): pair of address to token database and user token
+        future (Future): future of the lookup
+
+    Raises:
+        TokenDatabaseError: token database returns unknown status or error
+
+    Returns:
+        TokenInfo | None: token information or None if not found
+    """
+    try:
+        token_info = _fetch_token_info(*key)
+    except BaseException as e:
+        _finish_lookup(key, future, e)
+        raise
+    _finish_lookup(key, future, token_info)
+    return token_info
+
+
+def _finish_lookup(key: tuple[str, str], future: Future, result: TokenInfo | BaseException | None) -> None:
+    """Publish the result of a lookup and remove it from the lookups in flight.
+
+    Args:
+        key (tuple[str, str]): pair of address to token database and user token
+        future (Future): future of the lookup
+        result (TokenInfo | BaseException | None): token information, None if not found, or the raised exception
+    """
+    with _inflight_lookups_lock:
+        del _inflight_lookups[key]
+    if isinstance(result, BaseException):
+        future.set_exception(result)
+    else:
+        future.set_result(result)
+
+
+@atexit.register
+def _close_token_database_channels() -> None:
+    """Close all shared channels to the token database."""
+    global _refresh_executor_closed  # noqa: PLW0603
+    with _refresh_executor_lock:
+        _refresh_executor_closed = True
+        if _refresh_executor is not None:
+            _refresh_executor.shutdown(wait=False)
+    with _channels_lock:
+        for channel, _ in _channels.values():
+            channel.close()
+        _channels.clear()
+
+
 def get_token_info(address_to_token_database: str, token: str) -> TokenInfo | None:
     """Get token information from token database.
 
+    Successful lookups and not-found results are cached for a short time to skip repeated requests,
+    and concurrent lookups of the same token share a single request. Entries past half of their TTL are
+    refreshed in the background while the cached result is returned.
+
     Args:
         address_to_token_database (str): address to token database
         token (str): user token
@@ -45,38 +302,63 @@ def get_token_info(address_to_token_database: str, token: str) -> TokenInfo | No
     Returns:
         TokenInfo | None: token information or None if not found
     """
+    cache_key = (address_to_token_database, token)
+    found, cached_token_info = _get_cached_token_info(cache_key)
+    if found:
+        return cached_token_info
+
+    future, is_owner = _start_lookup(cache_key, background=False)
+    if is_owner:
+        return _run_lookup(cache_key, future)
+    return future.result()
+
+
+def _fetch_token_info(address_to_token_database: str, token: str) -> TokenInfo | None:
+    """Get token information from token database and cache the result.
+
+    Args:
+        address_to_token_database (str): address to token database
+        token (str): user token
+
+    Raises:
+        TokenDatabaseError: token database returns unknown status or error
+
+    Returns:
+        TokenInfo | None: token information or None if not found
+    """
+    cache_key = (address_to_token_database, token)
     try:
-        with grpc.insecure_channel(address_to_token_database) as channel:
-            stub = token_database_pb2_grpc.TokenDatabaseServiceStub(channel)
-            logger.info("Getting token info from token database (token: %s).", token)
-            response: token_database_pb2.GetTokenInfoResponse = stub.GetTokenInfo(
-                token_database_pb2.GetTokenInfoRequest(token=token),
-            )
+        stub = _get_token_database_stub(address_to_token_database)
+        logger.debug("Getting token info from token database.")
+        response: token_database_pb2.GetTokenInfoResponse = stub.GetTokenInfo(
+            token_database_pb2.GetTokenInfoRequest(token=token),
+            timeout=TOKEN_DATABASE_TIMEOUT_SECONDS,
+            metadata=_CALL_METADATA,
+        )
     except Exception as e:
-        msg = f"Failed to get token info (token: {token})."
+        msg = "Failed to get token info."
         logger.exception(msg)
         raise TokenDatabaseError(msg) from e
 
-    if response.status == token_database_pb2.DatabaseOperationStatus.DATABASE_OPERATION_STATUS_OK:
-        return TokenInfo(
-            role=response.token_info.role,
-            name=response.token_info.name,
-            expires_at=(
-                response.token_info.expires_at.ToDatetime(ZoneInfo("Asia/Tokyo"))
-                if response.token_info.expires_at.seconds > 0
-                else None
-            ),
+    status = response.status
+    if status == _STATUS_OK:
+        response_token_info = response.token_info
+        expires_at = response_token_info.expires_at
+        token_info = TokenInfo(
+            role=response_token_info.role,
+            name=response_token_info.name,
+            expires_at=expires_at.ToDatetime(_TOKYO) if expires_at.seconds > 0 else None,
         )
-    if response.status == token_database_pb2.DatabaseOperationStatus.DATABASE_OPERATION_STATUS_NOT_FOUND:
+        _cache_token_info(cache_key, token_info)
+        return token_info
+    if status == _STATUS_NOT_FOUND:
+        _cache_token_info(cache_key, None)
         return None
-    if response.status == token_database_pb2.DatabaseOperationStatus.DATABASE_OPERATION_STATUS_UNSPECIFIED:
-        msg = f"Token database returned an unexpected status (token: {token}, message: {response.detail})."
+    if status == _STATUS_UNSPECIFIED:
+        msg = f"Token database returned an unexpected status (message: {response.detail})."
         logger.error(msg)
         raise TokenDatabaseError(msg)
 
-    msg = (
-        f"Token database returned an unknown status "
-        f"(token: {token}, status: {response.status}, message: {response.detail})."
-    )
+    msg = f"Token database returned an unknown status (status: {status}, message: {response.detail})."
     logger.error(msg)
     raise TokenDatabaseError(msg)
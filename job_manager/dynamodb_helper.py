@@ -2,6 +2,10 @@
 
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
 from typing import Any
 
 from botocore.exceptions import ClientError
@@ -13,10 +17,32 @@ logger = logging.getLogger(__name__)
 
 DYNAMODB_JOB_TABLE_GSI_NAME = os.getenv("DYNAMODB_JOB_TABLE_GSI_NAME", "status-index")
 
+# `TypeSerializer` holds no state, so a single instance is shared by all calls.
+_SERIALIZER = DynamoDBTypeSerializer()
+
+# The maximum number of items updated in a single `TransactWriteItems` call by `change_items_status`.
+TRANSACT_WRITE_MAX_ITEMS = 25
+# The maximum number of `TransactWriteItems` calls issued concurrently by `change_items_status`.
+CHANGE_ITEMS_STATUS_MAX_WORKERS = 16
+
+
+# Pairs of endpoint URL and table name of the tables confirmed to exist by `check_table_exists`.
+_existing_tables: set[tuple[str, str]] = set()
+_existing_tables_lock = threading.Lock()
+
+
+def invalidate_table_cache() -> None:
+    """Forget the tables confirmed to exist so that `check_table_exists` queries DynamoDB again."""
+    with _existing_tables_lock:
+        _existing_tables.clear()
+
 
 def check_table_exists(dynamodb_client: DynamoDBClient, table_name: str) -> bool:
     """Check if a DynamoDB table exists.
 
+    A table confirmed to exist is remembered for the lifetime of the process,
+    so `DescribeTable` is issued at most once per endpoint and table.
+
     Args:
         dynamodb_client (DynamoDBClient): DynamoDB client.
         table_name (str): DynamoDB table name.
@@ -27,6 +53,11 @@ def check_table_exists(dynamodb_client: DynamoDBClient, table_name: str) -> bool
     Raises:
         ClientError: If an error occurs during checking the table existence.
     """
+    cache_key = (dynamodb_client.meta.endpoint_url, table_name)
+    with _existing_tables_lock:
+        if cache_key in _existing_tables:
+            return True
+
     try:
         logger.info("Checking if DynamoDB table exists (table name: %s).", table_name)
         dynamodb_client.describe_table(TableName=table_name)
@@ -35,8 +66,10 @@ def check_table_exists(dynamodb_client: DynamoDBClient, table_name: str) -> bool
             return False
         logger.exception("Failed to check if DynamoDB table '%s' exists.", table_name)
         raise
-    else:
-        return True
+
+    with _existing_tables_lock:
+        _existing_tables.add(cache_key)
+    return True
 
 
 def put_item(dynamodb_client: DynamoDBClient, table_name: str, dynamodb_item: dict[str, dict[str, Any]]) -> None:
@@ -52,7 +85,7 @@ def put_item(dynamodb_client: DynamoDBClient, table_name: str, dynamodb_item: di
         ValueError: If the item with the same job ID already exists in the table.
     """
     try:
-        logger.info("Adding an item to the database.")
+        logger.debug("Adding an item to the database.")
         dynamodb_client.put_item(
             TableName=table_name, Item=dynamodb_item, ConditionExpression="attribute_not_exists(job_id)"
         )
@@ -65,13 +98,16 @@ def put_item(dynamodb_client: DynamoDBClient, table_name: str, dynamodb_item: di
         raise
 
 
-def get_item(dynamodb_client: DynamoDBClient, table_name: str, job_id: str) -> dict[str, Any]:
+def get_item(
+    dynamodb_client: DynamoDBClient, table_name: str, job_id: str, *, consistent_read: bool = False
+) -> dict[str, Any]:
     """Retrieve an item from the DynamoDB table by the job ID.
 
     Args:
         dynamodb_client (DynamoDBClient): DynamoDB client.
         table_name (str): DynamoDB table name.
         job_id (str): The job ID of the item to retrieve.
+        consistent_read (bool): Whether to perform a strongly consistent read.
 
     Returns:
         dict[str, Any]: The retrieved DynamoDB item as a dictionary.
@@ -81,14 +117,16 @@ def get_item(dynamodb_client: DynamoDBClient, table_name: str, job_id: str) -> d
         ClientError: If an error occurs while retrieving the item.
     """
     try:
-        logger.info("Retrieving an item from the database (job ID: %s).", job_id)
+        logger.debug("Retrieving an item from the database (job ID: %s).", job_id)
         response = dynamodb_client.get_item(
             TableName=table_name,
             Key={"job_id": {"S": job_id}},
+            ConsistentRead=consistent_read,
         )
         if "Item" not in response:
             msg = f"The item with job ID {job_id} does not exist in the database."
-            logger.error(msg)
+            # Clients may poll unknown job IDs, so this is not an error of the scheduler.
+            logger.debug(msg)
             raise ValueError(msg)
         return response["Item"]
     except ClientError:
@@ -97,7 +135,7 @@ def get_item(dynamodb_client: DynamoDBClient, table_name: str, job_id: str) -> d
 
 
 def get_items_by_status(
-    dynamodb_client: DynamoDBClient, table_name: str, status: str
+    dynamodb_client: DynamoDBClient, table_name: str, status: str, *, projection: str | None = None
 ) -> list[dict[str, dict[str, Any]]]:
     """Retrieve all items with the specified status from the DynamoDB table.
 
@@ -105,6 +143,8 @@ def get_items_by_status(
         dynamodb_client (DynamoDBClient): DynamoDB client.
         table_name (str): DynamoDB table name.
         status (str): Status name to filter items.
+        projection (str | None): Projection expression of the attributes to retrieve.
+            If None, all attributes are retrieved.
 
     Returns:
         list[dict[str, dict[str, Any]]]: List of DynamoDB items with the specified status.
@@ -112,42 +152,49 @@ def get_items_by_status(
     Raises:
         ClientError: If an error occurs during the query operation.
     """
-    result_items = []
     try:
         logger.info("Retrieving items with status '%s' from the database.", status)
-        response = dynamodb_client.query(
-            TableName=table_name,
-            IndexName=DYNAMODB_JOB_TABLE_GSI_NAME,
-            KeyConditionExpression="#status = :status",
-            ExpressionAttributeNames={"#status": "status"},
-            ExpressionAttributeValues={":status": {"S": status}},
-        )
-        result_items.extend(response.get("Items", []))
-
-        while "LastEvaluatedKey" in response:
-            logger.info(
-                "Retrieving additional items with status '%s' from the database (current items: %d).",
-                status,
-                len(result_items),
-            )
-            response = dynamodb_client.query(
-                TableName=table_name,
-                IndexName=DYNAMODB_JOB_TABLE_GSI_NAME,
-                KeyConditionExpression="#status = :status",
-                ExpressionAttributeNames={"#status": "status"},
-                ExpressionAttributeValues={":status": {"S": status}},
-                ExclusiveStartKey=response["LastEvaluatedKey"],
-            )
-            result_items.extend(response.get("Items", []))
-
+        query_kwargs: dict[str, Any] = {
+            "TableName": table_name,
+            "IndexName": DYNAMODB_JOB_TABLE_GSI_NAME,
+            "KeyConditionExpression": "#status = :status",
+            "ExpressionAttributeNames": {"#status": "status"},
+            "ExpressionAttributeValues": {":status": {"S": status}},
+        }
+        if projection is not None:
+            query_kwargs["ProjectionExpression"] = projection
+        paginator = dynamodb_client.get_paginator("query")
+        pages = paginator.paginate(**query_kwargs)
+        return list(chain.from_iterable(page.get("Items", []) for page in pages))
     except ClientError:
         logger.exception("Failed to retrieve items with status '%s' from the database.", status)
         raise
 
-    return result_items
+
+@lru_cache(maxsize=128)
+def _build_update_expression(keys: tuple[str, ...]) -> tuple[str, dict[str, str]]:
+    """Build the update expression and attribute names to set the given attributes.
+
+    Callers update the same sets of attributes repeatedly, so the results are cached.
+    The returned dictionary is shared between calls and must not be modified.
+
+    Args:
+        keys (tuple[str, ...]): Names of the attributes to update.
+
+    Returns:
+        tuple[str, dict[str, str]]: The update expression and the expression attribute names.
+    """
+    return "SET " + ", ".join(f"#{key} = :{key}" for key in keys), {f"#{key}": key for key in keys}
 
 
-def update_item(dynamodb_client: DynamoDBClient, table_name: str, job_id: str, update_values: dict) -> None:
+def update_item(
+    dynamodb_client: DynamoDBClient,
+    table_name: str,
+    job_id: str,
+    update_values: dict,
+    *,
+    expected_status: JobStatus | None = None,
+) -> None:
     """Update values of an item in the DynamoDB table.
 
     Args:
@@ -155,41 +202,204 @@ def update_item(dynamodb_client: DynamoDBClient, table_name: str, job_id: str, u
         table_name (str): DynamoDB table name.
         job_id (str): The job ID of the item to update.
         update_values (dict): Dictionary of attribute names to values to be updated.
+        expected_status (JobStatus | None): Status the item is expected to have.
+            If given, the item is updated only if it has this status.
 
     Raises:
         ClientError: If updating the item fails.
-        ValueError: If the item with the given job ID does not exist in the table.
+        ValueError: If the item with the given job ID does not exist in the table
+            or does not have the expected status.
     """
     try:
-        update_expression = "SET " + ", ".join(f"#{key} = :{key}" for key in update_values)
-        expression_attribute_names = {f"#{key}": key for key in update_values}
-        expression_attribute_values = {
-            f":{key}": DynamoDBTypeSerializer().serialize(value) for key, value in update_values.items()
-        }
-
-        logger.info("Updating an item in the database (job ID: %s).", job_id)
-        dynamodb_client.update_item(
-            TableName=table_name,
-            Key={"job_id": {"S": job_id}},
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values,
-            ConditionExpression="attribute_exists(job_id)",
-        )
+        logger.debug("Updating an item in the database (job ID: %s).", job_id)
+        dynamodb_client.update_item(**_build_update_params(table_name, job_id, update_values, expected_status))
     except ClientError as e:
         if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
-            msg = f"The item with job ID {job_id} does not exist in the database."
+            if expected_status is None:
+                msg = f"The item with job ID {job_id} does not exist in the database."
+            else:
+                msg = (
+                    f"The item with job ID {job_id} does not exist in the database "
+                    f"or its status is not '{expected_status.name}'."
+                )
             logger.exception(msg)
             raise ValueError(msg) from e
         logger.exception("Failed to update an item in the database (job ID: %s).", job_id)
         raise
 
 
+def _build_update_params(
+    table_name: str, job_id: str, update_values: dict, expected_status: JobStatus | None = None
+) -> dict[str, Any]:
+    """Build the parameters of an update of an existing item.
+
+    Args:
+        table_name (str): DynamoDB table name.
+        job_id (str): The job ID of the item to update.
+        update_values (dict): Dictionary of attribute names to values to be updated.
+        expected_status (JobStatus | None): Status the item is expected to have, if the update is conditioned on it.
+
+    Returns:
+        dict[str, Any]: Parameters of the update, shared by `UpdateItem` and `TransactWriteItems`.
+    """
+    update_expression, expression_attribute_names = _build_update_expression(tuple(update_values))
+    expression_attribute_values = {f":{key}": _SERIALIZER.serialize(value) for key, value in update_values.items()}
+    condition_expression = "attribute_exists(job_id)"
+    if expected_status is not None:
+        # The cached attribute names are shared, so they are copied before adding the status.
+        expression_attribute_names = {**expression_attribute_names, "#status": "status"}
+        expression_attribute_values[":expected_status"] = {"S": expected_status.name}
+        condition_expression += " AND #status = :expected_status"
+    return {
+        "TableName": table_name,
+        "Key": {"job_id": {"S": job_id}},
+        "UpdateExpression": update_expression,
+        "ExpressionAttributeNames": expression_attribute_names,
+        "ExpressionAttributeValues": expression_attribute_values,
+        "ConditionExpression": condition_expression,
+    }
+
+
+def update_items(dynamodb_client: DynamoDBClient, table_name: str, update_values_by_job_id: dict[str, dict]) -> None:
+    """Update values of multiple items in the DynamoDB table.
+
+    Items are updated in transactions of up to `TRANSACT_WRITE_MAX_ITEMS` items. If a transaction is cancelled
+    (e.g. because some items have been deleted), its items are updated one by one and missing items are skipped.
+
+    Args:
+        dynamodb_client (DynamoDBClient): DynamoDB client.
+        table_name (str): DynamoDB table name.
+        update_values_by_job_id (dict[str, dict]): Mapping from job ID to the values to be updated for the item.
+
+    Raises:
+        ClientError: If updating the items fails.
+    """
+    job_ids = list(update_values_by_job_id)
+    for i in range(0, len(job_ids), TRANSACT_WRITE_MAX_ITEMS):
+        chunk = job_ids[i : i + TRANSACT_WRITE_MAX_ITEMS]
+        try:
+            logger.debug("Updating %d items in the database.", len(chunk))
+            dynamodb_client.transact_write_items(
+                TransactItems=[
+                    {"Update": _build_update_params(table_name, job_id, update_values_by_job_id[job_id])}
+                    for job_id in chunk
+                ]
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "TransactionCanceledException":
+                logger.exception("Failed to update items in the database.")
+                raise
+            logger.warning("The transaction was cancelled. Falling back to updating the items one by one.")
+            for job_id in chunk:
+                try:
+                    update_item(dynamodb_client, table_name, job_id, update_values_by_job_id[job_id])
+                except ValueError:
+                    logger.warning("Skipping update because the item does not exist (job ID: %s).", job_id)
+
+
+def _build_status_update_params(table_name: str, old_status: JobStatus, new_status: JobStatus) -> dict[str, Any]:
+    """Build the parameters of a conditional update from the old status to the new status.
+
+    The parameters are shared by all items updated in a single `change_items_status` call,
+    so only the key of each item has to be added per item.
+
+    Args:
+        table_name (str): DynamoDB table name.
+        old_status (JobStatus): Status the items are expected to have.
+        new_status (JobStatus): New status to set for the items.
+
+    Returns:
+        dict[str, Any]: Parameters of the update except `Key`, shared by `UpdateItem` and `TransactWriteItems`.
+    """
+    return {
+        "TableName": table_name,
+        "UpdateExpression": "SET #status = :new_status",
+        "ConditionExpression": "#status = :old_status",
+        "ExpressionAttributeNames": {"#status": "status"},
+        "ExpressionAttributeValues": {
+            ":new_status": {"S": new_status.name},
+            ":old_status": {"S": old_status.name},
+        },
+    }
+
+
+def _change_item_status(
+    dynamodb_client: DynamoDBClient,
+    job_id: str,
+    update_params: dict[str, Any],
+    old_status: JobStatus,
+    new_status: JobStatus,
+) -> None:
+    """Update the status of an item, skipping it if its status has already been changed.
+
+    Args:
+        dynamodb_client (DynamoDBClient): DynamoDB client.
+        job_id (str): The job ID of the item to update.
+        update_params (dict[str, Any]): Parameters built by `_build_status_update_params`.
+        old_status (JobStatus): Status the item is expected to have.
+        new_status (JobStatus): New status to set for the item.
+
+    Raises:
+        ClientError: If an error other than a failed condition occurs during the update.
+    """
+    try:
+        logger.info(
+            "Updating the item status from '%s' to '%s' (job ID: %s).", old_status.name, new_status.name, job_id
+        )
+        dynamodb_client.update_item(**update_params, Key={"job_id": {"S": job_id}})
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            logger.warning("Skipping update because the item status has been changed (job ID: %s).", job_id)
+            return
+        logger.exception("Failed to update item %s from status %s to %s.", job_id, old_status.name, new_status.name)
+        raise
+
+
+def _change_items_status_in_transaction(
+    dynamodb_client: DynamoDBClient,
+    job_ids: list[str],
+    update_params: dict[str, Any],
+    old_status: JobStatus,
+    new_status: JobStatus,
+) -> None:
+    """Update the status of items in a single transaction.
+
+    If the transaction is cancelled (e.g. because the status of some items has already been changed),
+    the items are updated one by one so that only the changed items are skipped.
+
+    Args:
+        dynamodb_client (DynamoDBClient): DynamoDB client.
+        job_ids (list[str]): The job IDs of the items to update.
+        update_params (dict[str, Any]): Parameters built by `_build_status_update_params`.
+        old_status (JobStatus): Status the items are expected to have.
+        new_status (JobStatus): New status to set for the items.
+
+    Raises:
+        ClientError: If an error occurs during the update operations.
+    """
+    try:
+        logger.info(
+            "Updating the status of %d items from '%s' to '%s'.", len(job_ids), old_status.name, new_status.name
+        )
+        dynamodb_client.transact_write_items(
+            TransactItems=[{"Update": {**update_params, "Key": {"job_id": {"S": job_id}}}} for job_id in job_ids]
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "TransactionCanceledException":
+            raise
+        logger.warning("The transaction was cancelled. Falling back to updating the items one by one.")
+        for job_id in job_ids:
+            _change_item_status(dynamodb_client, job_id, update_params, old_status, new_status)
+
+
 def change_items_status(
     dynamodb_client: DynamoDBClient, table_name: str, old_status: JobStatus, new_status: JobStatus
 ) -> None:
     """Update all items with the specified old status to the specified new status in the DynamoDB table.
 
+    Items are updated in transactions of up to `TRANSACT_WRITE_MAX_ITEMS` items issued concurrently.
+    Items whose status has been changed in the meantime are skipped.
+
     Args:
         dynamodb_client (DynamoDBClient): DynamoDB client.
         table_name (str): DynamoDB table name.
@@ -200,39 +410,25 @@ def change_items_status(
         ClientError: If an error occurs during the update operations.
     """
     try:
-        items = get_items_by_status(dynamodb_client, table_name, old_status.name)
-        for item in items:
-            try:
-                job_id = item["job_id"]["S"]
-                update_expression = "SET #status = :new_status"
-                condition_expression = "#status = :old_status"
-                expression_attribute_names = {"#status": "status"}
-                expression_attribute_values = {
-                    ":new_status": {"S": new_status.name},
-                    ":old_status": {"S": old_status.name},
-                }
-                logger.info(
-                    "Updating the item status from '%s' to '%s' (job ID: %s).",
-                    old_status.name,
-                    new_status.name,
-                    job_id,
-                )
-                dynamodb_client.update_item(
-                    TableName=table_name,
-                    Key={"job_id": {"S": job_id}},
-                    UpdateExpression=update_expression,
-                    ExpressionAttributeNames=expression_attribute_names,
-                    ExpressionAttributeValues=expression_attribute_values,
-                    ConditionExpression=condition_expression,
-                )
-            except ClientError as e:
-                if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
-                    logger.warning("Skipping update because the item status has been changed (job ID: %s).", job_id)
-                    continue
-                logger.exception(
-                    "Failed to update item %s from status %s to %s.", job_id, old_status.name, new_status.name
+        # Only the job IDs are needed to update the items.
+        items = get_items_by_status(dynamodb_client, table_name, old_status.name, projection="job_id")
+        job_ids = [item["job_id"]["S"] for item in items]
+        chunks = [
+            job_ids[i : i + TRANSACT_WRITE_MAX_ITEMS] for i in range(0, len(job_ids), TRANSACT_WRITE_MAX_ITEMS)
+        ]
+        if not chunks:
+            return
+
+        update_params = _build_status_update_params(table_name, old_status, new_status)
+        with ThreadPoolExecutor(max_workers=min(CHANGE_ITEMS_STATUS_MAX_WORKERS, len(chunks))) as executor:
+            futures = [
+                executor.submit(
+                    _change_items_status_in_transaction, dynamodb_client, chunk, update_params, old_status, new_status
                 )
-                raise
+                for chunk in chunks
+            ]
+            for future in futures:
+                future.result()
     except ClientError:
         logger.exception("Failed to update items from status '%s' to '%s'.", old_status.name, new_status.name)
         raise
@@ -257,19 +453,17 @@ def check_item_exists(
         bool: True if the item exists, False otherwise
 
     Raises:
-        ClientError: If the query operation fails
+        ClientError: If the get operation fails
     """
     try:
-        logger.info("Checking if an item exists in the database (job ID: %s).", job_id)
-        response = dynamodb_client.query(
+        logger.debug("Checking if an item exists in the database (job ID: %s).", job_id)
+        response = dynamodb_client.get_item(
             TableName=table_name,
-            KeyConditionExpression="job_id = :job_id",
-            ExpressionAttributeValues={":job_id": {"S": job_id}},
-            Select="COUNT",
-            Limit=1,
+            Key={"job_id": {"S": job_id}},
+            ProjectionExpression="job_id",
             ConsistentRead=consistent_read,
         )
-        return response["Count"] > 0
+        return "Item" in response
     except ClientError:
         logger.exception("Failed to check if an item exists in the database (job ID: %s).", job_id)
         raise
@@ -1,9 +1,16 @@
 """Job manager module."""
 
 import logging
+import threading
+import time
 import uuid
-from datetime import timedelta
-from typing import TYPE_CHECKING, cast
+from collections import deque
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, cast
 
 import boto3
 from __version__ import __version__
@@ -21,11 +28,10 @@ from utility import (
     convert_timestamp_to_datetime,
     get_current_datetime,
     get_current_timestamp,
-    get_relative_timestamp,
 )
 
 from . import dynamodb_helper
-from .job_metadata import JobMetadata, JobStatus, StateSavePolicy
+from .job_metadata import JOB_EXPIRY_DELTA, JobMetadata, JobStatus, StateSavePolicy
 from .job_queue import JobQueueContainer
 from .job_repository import JobRepository
 
@@ -35,6 +41,48 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# The maximum number of job inputs downloaded concurrently while restoring the job queue.
+RESTORE_DOWNLOAD_MAX_WORKERS = 32
+
+# Status messages without parameters are resolved once and shared, since `StatusMessage` is immutable.
+_INTERNAL_ERROR = get_status_message(key="INTERNAL_ERROR")
+_CRITICAL_ERROR = get_status_message(key="CRITICAL_ERROR")
+_RESOURCE_LIMIT_EXCEEDED = get_status_message(key="RESOURCE_LIMIT_EXCEEDED")
+_INVALID_JOB_STATE = get_status_message(key="INVALID_JOB_STATE")
+
+_EXECUTION_STATUS_TO_JOB_STATUS: dict[execution_pb2.ExecutionStatus, JobStatus] = {
+    execution_pb2.ExecutionStatus.EXECUTION_STATUS_SUCCESS: JobStatus.COMPLETED,
+    execution_pb2.ExecutionStatus.EXECUTION_STATUS_FAILURE: JobStatus.FAILED,
+    execution_pb2.ExecutionStatus.EXECUTION_STATUS_TIMEOUT: JobStatus.TIMEOUT,
+}
+
+# The maximum number of attempts of the background update of an assigned job to RUNNING, and the backoff before
+# the second attempt, doubled for each later attempt.
+MARK_RUNNING_MAX_ATTEMPTS = 3
+MARK_RUNNING_INITIAL_BACKOFF_SECONDS = 0.1
+# The maximum number of background writes of job statuses running at once. They run apart from the other I/O of
+# the job manager, so that writes waiting to be retried do not delay the assignment of jobs.
+STATUS_WRITE_MAX_WORKERS = 8
+
+# Lifetime and capacity of the cache of job metadata used for the fields that never change after submission.
+JOB_METADATA_CACHE_TTL_SECONDS = 60.0
+JOB_METADATA_CACHE_MAX_ENTRIES = 10_000
+
+
+@lru_cache(maxsize=256)
+def _duration(seconds: int) -> Duration:
+    """Get a `Duration` of the given seconds, shared by calls with the same value.
+
+    Message fields copy the assigned message, so the returned instance is never modified by its users.
+
+    Args:
+        seconds (int): The duration in seconds.
+
+    Returns:
+        Duration: The duration.
+    """
+    return Duration(seconds=seconds)
+
 
 class JobManager:
     """Job manager class."""
@@ -78,6 +126,20 @@ class JobManager:
         )
 
         self.job_repository = job_repository
+        # Runs I/O that does not depend on the result of another call concurrently with it.
+        self._io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="job-manager-io")
+
+        # Runs the status writes in the background.
+        self._status_write_executor = ThreadPoolExecutor(
+            max_workers=STATUS_WRITE_MAX_WORKERS, thread_name_prefix="job-manager-status-write"
+        )
+        # Mapping from job ID to the status write running in the background.
+        self._pending_status_writes: dict[str, Future] = {}
+        self._pending_status_writes_lock = threading.Lock()
+
+        # Mapping from job ID to the monotonic time until which the entry is valid and the job metadata.
+        self._job_metadata_cache: dict[str, tuple[float, JobMetadata]] = {}
+        self._job_metadata_cache_lock = threading.Lock()
 
         self.table_name = dynamodb_table_name
         self.dynamodb_client = cast(
@@ -89,6 +151,11 @@ class JobManager:
                 aws_secret_access_key=aws_credentials.secret_access_key,
                 region_name=aws_credentials.region_name,
                 config=Config(
+                    max_pool_connections=64,
+                    tcp_keepalive=True,
+                    # Fail fast on a stalled connection so that the retries can use a fresh one.
+                    connect_timeout=1.0,
+                    read_timeout=3.0,
                     retries={"total_max_attempts": dynamodb_max_attempts, "mode": "standard"},
                 ),
             ),
@@ -117,19 +184,14 @@ class JobManager:
         Returns:
             JobStatus: The job status.
         """
-        match execution_status:
-            case execution_pb2.ExecutionStatus.EXECUTION_STATUS_SUCCESS:
-                return JobStatus.COMPLETED
-            case execution_pb2.ExecutionStatus.EXECUTION_STATUS_FAILURE:
-                return JobStatus.FAILED
-            case execution_pb2.ExecutionStatus.EXECUTION_STATUS_TIMEOUT:
-                return JobStatus.TIMEOUT
-            case _:
-                logger.warning("Unknown execution status: %s. Falling back to UNSPECIFIED.", execution_status)
-                return JobStatus.UNSPECIFIED
+        job_status = _EXECUTION_STATUS_TO_JOB_STATUS.get(execution_status)
+        if job_status is None:
+            logger.warning("Unknown execution status: %s. Falling back to UNSPECIFIED.", execution_status)
+            return JobStatus.UNSPECIFIED
+        return job_status
 
     def _mark_queued_job_as_failed(self, job_id: str, status_message: StatusMessage, dequeued_at: Timestamp) -> None:
-        """Update the status of a queued job to FAILED.
+        """Update the status of a queued job to FAILED, unless its status has been changed in the meantime.
 
         Args:
             job_id (str): The job ID.
@@ -150,10 +212,40 @@ class JobManager:
                 table_name=self.table_name,
                 job_id=job_id,
                 update_values=update_values,
+                expected_status=JobStatus.QUEUED,
             )
         except Exception:
             logger.exception("Failed to update the job status to FAILED (job ID: %s).", job_id)
 
+    def _mark_queued_jobs_as_failed(self, status_messages: dict[str, StatusMessage], dequeued_at: Timestamp) -> None:
+        """Update the status of queued jobs to FAILED in batches.
+
+        Args:
+            status_messages (dict[str, StatusMessage]): Mapping from job ID to the status message
+                representing the failure reason.
+            dequeued_at (Timestamp): The timestamp when the jobs were dequeued.
+        """
+        if not status_messages:
+            return
+
+        try:
+            logger.debug("Updating the status of %d jobs to FAILED.", len(status_messages))
+            dynamodb_helper.update_items(
+                dynamodb_client=self.dynamodb_client,
+                table_name=self.table_name,
+                update_values_by_job_id={
+                    job_id: {
+                        "status": JobStatus.FAILED,
+                        "status_code": status_message.code,
+                        "status_message": status_message.message,
+                        "dequeued_at": dequeued_at,
+                    }
+                    for job_id, status_message in status_messages.items()
+                },
+            )
+        except Exception:
+            logger.exception("Failed to update the status of %d jobs to FAILED.", len(status_messages))
+
     def _restore_job_queue(self) -> None:
         """Restore the job queue from the DynamoDB table.
 
@@ -169,6 +261,9 @@ class JobManager:
             logger.exception(msg)
             raise RuntimeError(msg) from e
 
+        # Jobs that cannot be restored are marked as FAILED together at the end.
+        failed_jobs: dict[str, StatusMessage] = {}
+        restorable_jobs: list[JobMetadata] = []
         for item in queued_items:
             job_metadata = JobMetadata.from_dynamodb_item(item)
             job_id = job_metadata.job_id
@@ -180,54 +275,78 @@ class JobManager:
                     job_id,
                     requested_backend,
                 )
-                self._mark_queued_job_as_failed(
-                    job_id=job_id,
-                    status_message=get_status_message(key="CRITICAL_ERROR"),
-                    dequeued_at=get_current_timestamp(),
-                )
+                failed_jobs[job_id] = _CRITICAL_ERROR
                 continue
 
-            queued_at = job_metadata.queued_at
-            if queued_at is None:
+            if job_metadata.queued_at is None:
                 logger.error(
                     "Failed to restore a job due to missing 'queued_at' (job ID: %s).",
                     job_id,
                 )
-                self._mark_queued_job_as_failed(
-                    job_id=job_id,
-                    status_message=get_status_message(key="CRITICAL_ERROR"),
-                    dequeued_at=get_current_timestamp(),
-                )
+                failed_jobs[job_id] = _CRITICAL_ERROR
                 continue
 
-            program = self.job_repository.download_job_input(job_id=job_id)
-            if program is None:
-                logger.error("Failed to download a job program (job ID: %s).", job_id)
-                self._mark_queued_job_as_failed(
+            restorable_jobs.append(job_metadata)
+
+        # Push the jobs in the order they were queued.
+        restorable_jobs.sort(key=lambda job_metadata: cast("Timestamp", job_metadata.queued_at).ToNanoseconds())
+
+        # Download the job inputs concurrently. Pushing to the queue stays on this thread to keep the order, and
+        # at most `RESTORE_DOWNLOAD_MAX_WORKERS` inputs are downloaded or waiting to be pushed at once.
+        max_workers = max(1, min(RESTORE_DOWNLOAD_MAX_WORKERS, len(restorable_jobs)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending_jobs = iter(restorable_jobs)
+            downloads: deque[tuple[JobMetadata, Future]] = deque()
+
+            def start_next_download() -> None:
+                for job_metadata in pending_jobs:
+                    job_queue = self.job_queue[job_metadata.requested_backend]
+                    if job_queue.current_bytes >= job_queue.capacity_bytes:
+                        # Nothing is popped during the restore, so no later job fits into a full queue either.
+                        logger.error(
+                            "Failed to restore a job due to current resource limits (job ID: %s).",
+                            job_metadata.job_id,
+                        )
+                        failed_jobs[job_metadata.job_id] = _RESOURCE_LIMIT_EXCEEDED
+                        continue
+                    future = executor.submit(self.job_repository.download_job_input, job_metadata.job_id)
+                    downloads.append((job_metadata, future))
+                    return
+
+            for _ in range(max_workers):
+                start_next_download()
+
+            while downloads:
+                job_metadata, future = downloads.popleft()
+                program = future.result()
+                start_next_download()
+
+                job_id = job_metadata.job_id
+                if program is None:
+                    logger.error("Failed to download a job program (job ID: %s).", job_id)
+                    failed_jobs[job_id] = _INTERNAL_ERROR
+                    continue
+
+                if not self.job_queue[job_metadata.requested_backend].try_push(
                     job_id=job_id,
-                    status_message=get_status_message(key="INTERNAL_ERROR"),
-                    dequeued_at=get_current_timestamp(),
-                )
-                continue
+                    program=program,
+                    token=job_metadata.token,
+                    role=job_metadata.role,
+                    queued_at=convert_timestamp_to_datetime(cast("Timestamp", job_metadata.queued_at)),
+                    timeout=timedelta(seconds=job_metadata.max_elapsed_s),
+                ):
+                    logger.error("Failed to restore a job due to current resource limits (job ID: %s).", job_id)
+                    failed_jobs[job_id] = _RESOURCE_LIMIT_EXCEEDED
 
-            if not self.job_queue[requested_backend].try_push(
-                job_id=job_id,
-                program=program,
-                token=job_metadata.token,
-                role=job_metadata.role,
-                queued_at=convert_timestamp_to_datetime(queued_at),
-                timeout=timedelta(seconds=job_metadata.max_elapsed_s),
-            ):
-                logger.error("Failed to restore a job due to current resource limits (job ID: %s).", job_id)
-                self._mark_queued_job_as_failed(
-                    job_id=job_id,
-                    status_message=get_status_message(key="RESOURCE_LIMIT_EXCEEDED"),
-                    dequeued_at=get_current_timestamp(),
-                )
+        self._mark_queued_jobs_as_failed(failed_jobs, dequeued_at=get_current_timestamp())
 
-    def add_job_request(self, job_request: submission_pb2.SubmitJobRequest, token_info: TokenInfo) -> JobMetadata:  # noqa: PLR0915
+    def add_job_request(self, job_request: submission_pb2.SubmitJobRequest, token_info: TokenInfo) -> JobMetadata:
         """Add a job request to the job manager.
 
+        The job is admitted to the queue before its input is uploaded and its metadata is recorded, so that a job
+        rejected by the limits of the queue costs a single write to the database. The caller must hold the lock
+        of the job queue until this returns, so that the job is not assigned before it is recorded.
+
         Args:
            job_request (submission_pb2.SubmitJobRequest): The job request.
            token_info (TokenInfo): The token information.
@@ -254,57 +373,49 @@ class JobManager:
             scheduler_version=__version__,
         )
 
-        logger.debug("Adding a job to the job queue (job ID: %s).", job_id)
+        status_message: StatusMessage | None = None
         if requested_backend not in self.job_queue:
             logger.debug("%s is not a supported backend (job ID: %s).", requested_backend, job_id)
             status_message = get_status_message(
                 key="INVALID_REQUEST", reason=f"{requested_backend} is not a supported backend."
             )
-            job_metadata.status = JobStatus.FAILED
-            job_metadata.status_code = status_message.code
-            job_metadata.status_message = status_message.message
         else:
             # Add the job to the job queue
+            logger.debug("Adding a job to the job queue (job ID: %s).", job_id)
+            queued_at = get_current_datetime()
             try:
-                queued_at = get_current_datetime()
-                if self.job_queue[requested_backend].try_push(
+                pushed = self.job_queue[requested_backend].try_push(
                     job_id=job_id,
                     program=job_request.job.program,
                     token=job_request.token,
                     role=token_info.role,
                     queued_at=queued_at,
                     timeout=timedelta(seconds=job_request.job.settings.timeout.seconds),
-                ):
-                    job_metadata.status = JobStatus.QUEUED
-                    job_metadata.queued_at = convert_datetime_to_timestamp(queued_at)
-                else:
-                    status_message = get_status_message(key="RESOURCE_LIMIT_EXCEEDED")
-                    job_metadata.status = JobStatus.FAILED
-                    job_metadata.status_code = status_message.code
-                    job_metadata.status_message = status_message.message
+                )
             except ValueError:
                 # If a job with the same ID is already in the queue, return immediately without overwriting it.
                 logger.exception("Failed to add the job to the queue (job ID: %s).", job_id)
-                status_message = get_status_message(key="CRITICAL_ERROR")
-                job_metadata.status = JobStatus.FAILED
-                job_metadata.status_code = status_message.code
-                job_metadata.status_message = status_message.message
+                self._set_failed(job_metadata, _CRITICAL_ERROR)
                 return job_metadata
 
-            if job_metadata.status != JobStatus.FAILED:
+            if not pushed:
+                status_message = _RESOURCE_LIMIT_EXCEEDED
+            else:
                 try:
                     self.job_repository.upload_job_input(program=job_request.job.program, job_metadata=job_metadata)
                 except ClientError:
-                    status_message = get_status_message(key="INTERNAL_ERROR")
-                    job_metadata.status = JobStatus.FAILED
-                    job_metadata.status_code = status_message.code
-                    job_metadata.status_message = status_message.message
+                    status_message = _INTERNAL_ERROR
                 except Exception:
-                    logger.exception("Failed to upload the job input (job ID: %s).", job_metadata.job_id)
-                    status_message = get_status_message(key="CRITICAL_ERROR")
-                    job_metadata.status = JobStatus.FAILED
-                    job_metadata.status_code = status_message.code
-                    job_metadata.status_message = status_message.message
+                    logger.exception("Failed to upload the job input (job ID: %s).", job_id)
+                    status_message = _CRITICAL_ERROR
+                if status_message is None:
+                    job_metadata.status = JobStatus.QUEUED
+                    job_metadata.queued_at = convert_datetime_to_timestamp(queued_at)
+                else:
+                    self.job_queue[requested_backend].try_remove(job_id=job_id)
+
+        if status_message is not None:
+            self._set_failed(job_metadata, status_message)
 
         try:
             logger.debug("Uploading the job metadata to the database (job ID: %s).", job_id)
@@ -317,13 +428,22 @@ class JobManager:
             logger.exception("Failed to upload the job metadata to the database (job ID: %s).", job_id)
             if job_metadata.status == JobStatus.QUEUED:
                 self.job_queue[requested_backend].try_remove(job_id=job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            job_metadata.status = JobStatus.FAILED
-            job_metadata.status_code = status_message.code
-            job_metadata.status_message = status_message.message
+            self._set_failed(job_metadata, _INTERNAL_ERROR)
 
         return job_metadata
 
+    @staticmethod
+    def _set_failed(job_metadata: JobMetadata, status_message: StatusMessage) -> None:
+        """Set the status of a job to FAILED with the reason.
+
+        Args:
+            job_metadata (JobMetadata): The job metadata, updated in place.
+            status_message (StatusMessage): The status message representing the failure reason.
+        """
+        job_metadata.status = JobStatus.FAILED
+        job_metadata.status_code = status_message.code
+        job_metadata.status_message = status_message.message
+
     def cancel_job(self, job_id: str) -> tuple[bool, StatusMessage]:
         """Cancel a job.
 
@@ -336,22 +456,22 @@ class JobManager:
            - error_message (StatusMessage): Error code and message on failure, empty on success.
         """
         try:
-            # Check if the job exists in the DynamoDB table.
-            if not dynamodb_helper.check_item_exists(
-                dynamodb_client=self.dynamodb_client, table_name=self.table_name, job_id=job_id
-            ):
+            # Retrieving the metadata also checks if the job exists in the DynamoDB table.
+            try:
+                job_metadata = self._get_immutable_job_metadata(job_id=job_id)
+            except ValueError:
                 logger.debug("The item with job ID %s does not exist in the database.", job_id)
                 return False, get_status_message(key="JOB_NOT_FOUND", job_id=job_id)
 
             # Remove the job from the queue.
-            job_metadata = self.get_job_metadata(job_id=job_id)
             backend = job_metadata.requested_backend
 
             if self.job_queue[backend].try_remove(job_id=job_id):
                 logger.debug("The job was successfully removed from the queue (job ID: %s).", job_id)
             else:
                 logger.debug("The job may already be running or cancelled (job ID: %s).", job_id)
-                return False, get_status_message(key="INVALID_JOB_STATE")
+                return False, _INVALID_JOB_STATE
+            self._evict_job_metadata(job_id)
 
             # Update the job status to CANCELLED.
             logger.debug("Updating the job status to CANCELLED (job ID: %s).", job_id)
@@ -363,7 +483,7 @@ class JobManager:
             )
         except Exception:
             logger.exception("Failed to cancel the job (job ID: %s).", job_id)
-            return False, get_status_message(key="INTERNAL_ERROR")
+            return False, _INTERNAL_ERROR
 
         return True, StatusMessage()
 
@@ -384,26 +504,72 @@ class JobManager:
         Returns:
            JobMetadata: The metadata of the job.
         """
-        if not dynamodb_helper.check_item_exists(
+        self._wait_for_status_write(job_id)
+        item = dynamodb_helper.get_item(
             dynamodb_client=self.dynamodb_client,
             table_name=self.table_name,
             job_id=job_id,
             consistent_read=consistent_read,
-        ):
-            msg = f"The item with job ID {job_id} does not exist in the database."
-            raise ValueError(msg)
-        item = dynamodb_helper.get_item(
-            dynamodb_client=self.dynamodb_client, table_name=self.table_name, job_id=job_id
         )
         return JobMetadata.from_dynamodb_item(dynamodb_item=item)
 
+    def _get_immutable_job_metadata(self, job_id: str, *, consistent_read: bool = False) -> JobMetadata:
+        """Get the metadata of a job, reusing the metadata retrieved by a recent call.
+
+        Only the fields that never change after submission (e.g. the requested backend, the role and
+        the execution settings) are reliable in the returned metadata. Use `get_job_metadata` for the status.
+
+        Args:
+          job_id (str): Job ID.
+          consistent_read (bool): Whether to perform a strongly consistent read if the metadata is not cached.
+
+        Raises:
+           ValueError: If the job ID is invalid.
+
+        Returns:
+           JobMetadata: The metadata of the job.
+        """
+        with self._job_metadata_cache_lock:
+            entry = self._job_metadata_cache.get(job_id)
+            if entry is not None:
+                if time.monotonic() < entry[0]:
+                    return entry[1]
+                del self._job_metadata_cache[job_id]
+
+        job_metadata = self.get_job_metadata(job_id=job_id, consistent_read=consistent_read)
+        with self._job_metadata_cache_lock:
+            if job_id not in self._job_metadata_cache and (
+                len(self._job_metadata_cache) >= JOB_METADATA_CACHE_MAX_ENTRIES
+            ):
+                # Evict the oldest entry.
+                del self._job_metadata_cache[next(iter(self._job_metadata_cache))]
+            self._job_metadata_cache[job_id] = (time.monotonic() + JOB_METADATA_CACHE_TTL_SECONDS, job_metadata)
+        return job_metadata
+
+    def _evict_job_metadata(self, job_id: str) -> None:
+        """Remove the metadata of a job that no longer needs to be looked up from the cache.
+
+        Args:
+          job_id (str): Job ID.
+        """
+        with self._job_metadata_cache_lock:
+            self._job_metadata_cache.pop(job_id, None)
+
     def fetch_next_job_to_execute(
-        self, request: execution_pb2.AssignNextJobRequest
+        self,
+        request: execution_pb2.AssignNextJobRequest,
+        queue_lock: AbstractContextManager | None = None,
     ) -> execution_pb2.AssignNextJobResponse:
         """Fetch the next job from the queue and construct a job request for the physical lab layer.
 
+        Jobs are discovered from the in-memory queue, so a poll that finds no job returns without accessing
+        DynamoDB or S3.
+
         Args:
             request (execution_pb2.AssignNextJobRequest): The request from the physical lab layer.
+            queue_lock (AbstractContextManager | None): Lock held only while popping the job from the queue,
+                so that retrieving its metadata and upload URL does not block other users of the lock.
+                The caller is responsible for the locking if this is None.
 
         Returns:
            execution_pb2.AssignNextJobResponse: The job request for the physical lab layer.
@@ -421,28 +587,32 @@ class JobManager:
             )
 
         logger.debug("Fetching the next job from the queue.")
-        next_job = self.job_queue[requested_backend].try_pop()
+        with queue_lock if queue_lock is not None else nullcontext():
+            next_job = self.job_queue[requested_backend].try_pop()
         if next_job is None:
             return execution_pb2.AssignNextJobResponse()
 
         job_id, program = next_job
         dequeued_at = get_current_timestamp()
 
+        # Generate the upload URL while retrieving the execution settings.
+        upload_url_future = self._io_executor.submit(self.job_repository.generate_upload_url, job_id)
+
         # Retrieve the execution settings
         try:
             logger.debug("Retrieving the job metadata (job ID: %s).", job_id)
-            job_metadata = self.get_job_metadata(job_id=job_id, consistent_read=True)
+            job_metadata = self._get_immutable_job_metadata(job_id=job_id, consistent_read=True)
             settings = job_pb2.JobExecutionSettings(
                 backend=job_metadata.requested_backend,
                 n_shots=job_metadata.n_shots,
-                timeout=Duration(seconds=job_metadata.max_elapsed_s),
+                timeout=_duration(job_metadata.max_elapsed_s),
                 state_save_policy=job_metadata.state_save_policy.value,
                 resource_squeezing_level=job_metadata.resource_squeezing_level,
                 role=job_metadata.role,
             )
         except Exception:
             logger.exception("Failed to retrieve the execution settings (job ID: %s).", job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
+            status_message = _INTERNAL_ERROR
             self._mark_queued_job_as_failed(job_id=job_id, status_message=status_message, dequeued_at=dequeued_at)
             return execution_pb2.AssignNextJobResponse(
                 error=error_detail_pb2.ErrorDetail(
@@ -453,10 +623,10 @@ class JobManager:
 
         # Generate the upload URL
         try:
-            upload_url, expires_at = self.job_repository.generate_upload_url(job_id)
+            upload_url, expires_at = upload_url_future.result()
         except Exception:
             logger.exception("Failed to generate the upload URL (job ID: %s).", job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
+            status_message = _INTERNAL_ERROR
             self._mark_queued_job_as_failed(job_id=job_id, status_message=status_message, dequeued_at=dequeued_at)
             return execution_pb2.AssignNextJobResponse(
                 error=error_detail_pb2.ErrorDetail(
@@ -465,38 +635,98 @@ class JobManager:
                 ),
             )
 
-        # Update the job metadata
-        try:
-            logger.debug("Updating the job status to RUNNING (job ID: %s).", job_id)
-            dynamodb_helper.update_item(
-                dynamodb_client=self.dynamodb_client,
-                table_name=self.table_name,
-                job_id=job_id,
-                update_values={
-                    "status": JobStatus.RUNNING,
-                    "dequeued_at": dequeued_at,
-                },
-            )
-            return execution_pb2.AssignNextJobResponse(
-                job_id=job_id,
-                job=job_pb2.Job(
-                    program=program,
-                    settings=settings,
-                ),
-                upload_target=job_pb2.JobResultUploadTarget(
-                    upload_url=upload_url,
-                    expires_at=expires_at,
-                ),
-            )
-        except Exception:
-            logger.exception("Failed to update the job status to RUNNING (job ID: %s).", job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return execution_pb2.AssignNextJobResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                ),
-            )
+        # The job is assigned once it is popped, so the response does not wait for the status update.
+        self._start_status_write(job_id, self._mark_job_as_running, job_id, dequeued_at)
+        return execution_pb2.AssignNextJobResponse(
+            job_id=job_id,
+            job=job_pb2.Job(
+                program=program,
+                settings=settings,
+            ),
+            upload_target=job_pb2.JobResultUploadTarget(
+                upload_url=upload_url,
+                expires_at=expires_at,
+            ),
+        )
+
+    def _mark_job_as_running(self, job_id: str, dequeued_at: Timestamp) -> None:
+        """Update the status of an assigned job from QUEUED to RUNNING.
+
+        Failed updates are retried with exponential backoff. If all attempts fail, the job is marked as FAILED
+        instead, so that it is not restored to the queue and executed again after a restart. It is not pushed back
+        to the queue since it has already been sent to the physical lab.
+
+        Args:
+            job_id (str): The job ID.
+            dequeued_at (Timestamp): The timestamp when the job was dequeued.
+        """
+        for attempt in range(1, MARK_RUNNING_MAX_ATTEMPTS + 1):
+            try:
+                logger.debug("Updating the job status to RUNNING (job ID: %s, attempt: %d).", job_id, attempt)
+                dynamodb_helper.update_item(
+                    dynamodb_client=self.dynamodb_client,
+                    table_name=self.table_name,
+                    job_id=job_id,
+                    update_values={
+                        "status": JobStatus.RUNNING,
+                        "dequeued_at": dequeued_at,
+                    },
+                    expected_status=JobStatus.QUEUED,
+                )
+            except ValueError:
+                # The job has been cancelled, failed or deleted in the meantime, and its status is kept.
+                logger.warning("Skipping the update to RUNNING since the job is no longer QUEUED (job ID: %s).", job_id)
+                return
+            except Exception:
+                logger.exception(
+                    "Failed to update the job status to RUNNING (job ID: %s, attempt: %d/%d).",
+                    job_id,
+                    attempt,
+                    MARK_RUNNING_MAX_ATTEMPTS,
+                )
+                if attempt < MARK_RUNNING_MAX_ATTEMPTS:
+                    time.sleep(MARK_RUNNING_INITIAL_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            else:
+                return
+
+        self._mark_queued_job_as_failed(job_id=job_id, status_message=_INTERNAL_ERROR, dequeued_at=dequeued_at)
+
+    def _start_status_write(self, job_id: str, fn: Callable[..., None], *args: Any) -> None:  # noqa: ANN401
+        """Run a write of the job status in the background.
+
+        Reads and later writes of the job wait for the write through `_wait_for_status_write`.
+
+        Args:
+            job_id (str): The job ID.
+            fn (Callable[..., None]): The function writing the status, which must not raise.
+            *args (Any): Arguments of the function.
+        """
+        with self._pending_status_writes_lock:
+            future = self._status_write_executor.submit(fn, *args)
+            self._pending_status_writes[job_id] = future
+        future.add_done_callback(lambda _: self._discard_status_write(job_id, future))
+
+    def _discard_status_write(self, job_id: str, future: Future) -> None:
+        """Forget a completed background write of the job status.
+
+        Args:
+            job_id (str): The job ID.
+            future (Future): The completed write.
+        """
+        with self._pending_status_writes_lock:
+            if self._pending_status_writes.get(job_id) is future:
+                del self._pending_status_writes[job_id]
+
+    def _wait_for_status_write(self, job_id: str) -> None:
+        """Wait for the background write of the job status, if any, to complete.
+
+        Args:
+            job_id (str): The job ID.
+        """
+        with self._pending_status_writes_lock:
+            future = self._pending_status_writes.get(job_id)
+        if future is not None:
+            future.result()
 
     def finalize_job(
         self, execution_result: execution_pb2.ReportExecutionResultRequest
@@ -510,43 +740,23 @@ class JobManager:
             execution_pb2.ReportExecutionResultResponse: Response to the physical lab layer.
         """
         job_id = execution_result.job_id
-        try:
-            if not dynamodb_helper.check_item_exists(
-                dynamodb_client=self.dynamodb_client, table_name=self.table_name, job_id=job_id
-            ):
-                logger.warning(
-                    "Failed to finalize job because the corresponding job was not found (job ID: %s).", job_id
-                )
-                status_message = get_status_message(key="JOB_NOT_FOUND", job_id=job_id)
-                return execution_pb2.ReportExecutionResultResponse(
-                    error=error_detail_pb2.ErrorDetail(
-                        code=status_message.code,
-                        description=status_message.message,
-                    )
-                )
-        except Exception:
-            logger.exception("Failed to finalize job due to an internal error (job ID: %s).", job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return execution_pb2.ReportExecutionResultResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
-
         status = self._map_execution_status_to_job_status(execution_result.status)
+        # The final status must not be overwritten by the RUNNING status of the assignment.
+        self._wait_for_status_write(job_id)
 
         if status == JobStatus.COMPLETED:
             # Set tags to the result object in S3 bucket.
             try:
                 logger.debug("Set tags to the result object (job ID: %s).", job_id)
-                job_metadata = self.get_job_metadata(job_id=job_id)
+                job_metadata = self._get_immutable_job_metadata(job_id=job_id)
                 self.job_repository.put_tags_to_result(
                     job_id=job_id, token_role=job_metadata.role, save_job=job_metadata.save_job
                 )
+            except ValueError:
+                return self._job_not_found_on_finalize(job_id)
             except Exception:
                 logger.exception("Failed to set tags to the result object (job ID: %s).", job_id)
-                status_message = get_status_message(key="INTERNAL_ERROR")
+                status_message = _INTERNAL_ERROR
                 return execution_pb2.ReportExecutionResultResponse(
                     error=error_detail_pb2.ErrorDetail(
                         code=status_message.code,
@@ -554,6 +764,8 @@ class JobManager:
                     )
                 )
 
+        # Both timestamps are derived from a single reading of the clock.
+        finished_at = get_current_datetime()
         try:
             logger.debug("Updating the job metadata (job ID: %s).", job_id)
             dynamodb_helper.update_item(
@@ -574,22 +786,45 @@ class JobManager:
                     "execution_finished_at": execution_result.timestamps.execution_finished_at,
                     "raw_size_bytes": execution_result.uploaded_result.raw_size_bytes,
                     "encoded_size_bytes": execution_result.uploaded_result.encoded_size_bytes,
-                    "finished_at": get_current_timestamp(),
-                    "job_expiry": get_relative_timestamp(timedelta(days=30)),
+                    "finished_at": convert_datetime_to_timestamp(finished_at),
+                    "job_expiry": convert_datetime_to_timestamp(finished_at + JOB_EXPIRY_DELTA),
                 },
             )
+        except ValueError:
+            # The update is conditioned on the existence of the job.
+            return self._job_not_found_on_finalize(job_id)
         except Exception:
             logger.exception("Failed to update the job metadata (job ID: %s).", job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
+            status_message = _INTERNAL_ERROR
             return execution_pb2.ReportExecutionResultResponse(
                 error=error_detail_pb2.ErrorDetail(
                     code=status_message.code,
                     description=status_message.message,
                 )
             )
+        self._evict_job_metadata(job_id)
         logger.info("Successfully updated the finished job metadata (job ID: %s).", job_id)
         return execution_pb2.ReportExecutionResultResponse()
 
+    @staticmethod
+    def _job_not_found_on_finalize(job_id: str) -> execution_pb2.ReportExecutionResultResponse:
+        """Construct the response to a finalization request for a job that does not exist.
+
+        Args:
+            job_id (str): Job ID.
+
+        Returns:
+            execution_pb2.ReportExecutionResultResponse: Response with the `JOB_NOT_FOUND` error.
+        """
+        logger.warning("Failed to finalize job because the corresponding job was not found (job ID: %s).", job_id)
+        status_message = get_status_message(key="JOB_NOT_FOUND", job_id=job_id)
+        return execution_pb2.ReportExecutionResultResponse(
+            error=error_detail_pb2.ErrorDetail(
+                code=status_message.code,
+                description=status_message.message,
+            )
+        )
+
     def get_job_result_download_url(self, job_id: str) -> tuple[str, Timestamp]:
         """Get the download URL of the result of the job.
 
@@ -1,22 +1,20 @@
 """Job metadata module."""
 
+from collections.abc import Callable
 from dataclasses import Field, dataclass, field, fields
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 from enum import Enum
 from typing import Any, Self, get_args
+from zoneinfo import ZoneInfo
 
 from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 from google.protobuf import timestamp_pb2
 from pb.mqc3_cloud.scheduler.v1 import job_pb2
-from utility import (
-    convert_datetime_to_timestamp,
-    convert_timestamp_to_datetime,
-    get_current_timestamp,
-    get_relative_timestamp,
-)
+from utility import convert_datetime_to_timestamp, get_current_datetime
 
 JOB_EXPIRY_DAYS = 30
+JOB_EXPIRY_DELTA = timedelta(days=JOB_EXPIRY_DAYS)
 
 
 class JobStatus(Enum):
@@ -40,6 +38,32 @@ class StateSavePolicy(Enum):
     NONE = job_pb2.JOB_STATE_SAVE_POLICY_NONE
 
 
+_TOKYO = ZoneInfo("Asia/Tokyo")
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _timestamp_to_isoformat(value: timestamp_pb2.Timestamp) -> str:
+    """Format a timestamp as `convert_timestamp_to_datetime(value).isoformat()` without the protobuf conversion.
+
+    Args:
+        value (timestamp_pb2.Timestamp): The timestamp to format.
+
+    Returns:
+        str: The timestamp in ISO 8601 format in the Asia/Tokyo time zone.
+    """
+    return datetime.fromtimestamp(value.seconds, _TOKYO).replace(microsecond=value.nanos // 1000).isoformat()
+
+
+# Conversions of the types that `TypeSerializer` does not support, dispatched on the exact type of the value.
+_SERIALIZE_HANDLERS: dict[type, Callable[[TypeSerializer, Any], dict[str, Any]]] = {
+    JobStatus: lambda _, value: {"S": value.name},
+    StateSavePolicy: lambda _, value: {"S": value.name},
+    datetime: lambda _, value: {"S": value.isoformat()},
+    timestamp_pb2.Timestamp: lambda _, value: {"S": _timestamp_to_isoformat(value)},
+    float: lambda serializer, value: TypeSerializer.serialize(serializer, Decimal(value)),
+}
+
+
 class DynamoDBTypeSerializer(TypeSerializer):
     """DynamoDB type serializer."""
 
@@ -52,22 +76,18 @@ class DynamoDBTypeSerializer(TypeSerializer):
         Returns:
             The DynamoDB attribute value.
         """
-        if isinstance(value, JobStatus):
-            return {"S": value.name}
-        if isinstance(value, StateSavePolicy):
-            return {"S": value.name}
-        if isinstance(value, datetime):
-            return {"S": value.isoformat()}
-        if isinstance(value, timestamp_pb2.Timestamp):
-            dt = convert_timestamp_to_datetime(value)
-            return self.serialize(dt)
-        if isinstance(value, float):
-            decimal_f = Decimal(value)
-            return self.serialize(decimal_f)
+        handler = _SERIALIZE_HANDLERS.get(type(value))
+        if handler is not None:
+            return handler(self, value)
         return super().serialize(value)
 
 
-@dataclass
+# Neither class holds state, so single instances are shared by all conversions.
+_SERIALIZER = DynamoDBTypeSerializer()
+_DESERIALIZER = TypeDeserializer()
+
+
+@dataclass(slots=True)
 class JobMetadata:
     """Job metadata class."""
 
@@ -118,10 +138,14 @@ class JobMetadata:
 
     def __post_init__(self) -> None:
         """Initialize the job metadata."""
+        if self.submitted_at is not None and self.job_expiry is not None:
+            return
+        # Both timestamps are derived from a single reading of the clock.
+        now = get_current_datetime()
         if self.submitted_at is None:
-            self.submitted_at = get_current_timestamp()
+            self.submitted_at = convert_datetime_to_timestamp(now)
         if self.job_expiry is None:
-            self.job_expiry = get_relative_timestamp(timedelta(days=JOB_EXPIRY_DAYS))
+            self.job_expiry = convert_datetime_to_timestamp(now + JOB_EXPIRY_DELTA)
 
     def to_dynamodb_item(self) -> dict[str, Any]:
         """Convert the job metadata to a dictionary compatible with DynamoDB Item format.
@@ -129,13 +153,7 @@ class JobMetadata:
         Returns:
             dict[str, dict[str, Any]]: Dictionary with DynamoDB attribute types.
         """
-        result = {}
-        dynamodb_serializer = DynamoDBTypeSerializer()
-        for class_field in fields(self):
-            field_name = class_field.name
-            field_value = getattr(self, field_name)
-            result[field_name] = dynamodb_serializer.serialize(value=field_value)
-        return result
+        return {field_name: serialize(getattr(self, field_name)) for field_name, serialize, _ in _JOB_METADATA_FIELDS}
 
     def get_proto_execution_version(self) -> job_pb2.JobExecutionVersion:
         """Get the execution version as a proto message.
@@ -181,51 +199,95 @@ class JobMetadata:
             JobMetadata: Job metadata object.
         """
         converted_data = {}
-        for class_field in fields(cls):
-            field_name = class_field.name
-
-            if field_name not in dynamodb_item:
+        deserialize = _DESERIALIZER.deserialize
+        for field_name, _, converter in _JOB_METADATA_FIELDS:
+            attribute_value = dynamodb_item.get(field_name)
+            if attribute_value is None:
                 msg = f"Missing field in DynamoDB item: {field_name}"
                 raise ValueError(msg)
 
-            attribute_value = dynamodb_item[field_name]
             if not isinstance(attribute_value, dict):
                 msg = f"Invalid DynamoDB item structure for field {field_name}."
                 raise TypeError(msg)
 
-            converted_data[field_name] = JobMetadata.__get_field_value(
-                attribute_value=attribute_value, target_field=class_field
-            )
+            dynamodb_value = deserialize(attribute_value)
+            converted_data[field_name] = None if dynamodb_value is None else converter(dynamodb_value)
 
         return cls(**converted_data)
 
-    @classmethod
-    def __get_field_value(
-        cls, attribute_value: dict[str, Any], target_field: Field
-    ) -> str | int | float | bool | JobStatus | StateSavePolicy | datetime | timestamp_pb2.Timestamp | None:
-        dynamodb_deserializer = TypeDeserializer()
-        dynamodb_value = dynamodb_deserializer.deserialize(value=attribute_value)
-        if dynamodb_value is None:
-            return None
-
-        field_type = target_field.type
-        if field_type is JobStatus:
-            field_value = JobStatus[dynamodb_value]
-        elif field_type is StateSavePolicy:
-            field_value = StateSavePolicy[dynamodb_value]
-        elif datetime in get_args(field_type):
-            field_value = datetime.fromisoformat(dynamodb_value)
-        elif timestamp_pb2.Timestamp in get_args(field_type):
-            dt = datetime.fromisoformat(dynamodb_value)
-            field_value = convert_datetime_to_timestamp(dt)
-        elif field_type in {bool, str} or {bool, str} & set(get_args(field_type)):
-            field_value = dynamodb_value
-        elif field_type is int or int in get_args(field_type):
-            field_value = int(dynamodb_value)
-        elif field_type is float or float in get_args(field_type):
-            field_value = float(dynamodb_value)
-        else:
-            msg = f"Unsupported type for field {target_field.name}: {field_type}"
-            raise ValueError(msg)
-
-        return field_value
+
+def _timestamp_from_isoformat(value: str) -> timestamp_pb2.Timestamp:
+    # Equivalent to `convert_datetime_to_timestamp`, which treats naive datetimes as UTC.
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    delta = dt - _EPOCH
+    return timestamp_pb2.Timestamp(seconds=delta.days * 86400 + delta.seconds, nanos=delta.microseconds * 1000)
+
+
+def _identity(value: Any) -> Any:  # noqa: ANN401
+    return value
+
+
+def _get_field_serializer(target_field: Field) -> Callable[[Any], dict[str, Any]]:
+    """Get the function converting the value of a `JobMetadata` field to a DynamoDB attribute value.
+
+    Fields of a non-optional scalar type are converted directly to their attribute value,
+    and the other fields are converted by `DynamoDBTypeSerializer`.
+
+    Args:
+        target_field (Field): The field of `JobMetadata`.
+
+    Returns:
+        Callable[[Any], dict[str, Any]]: The function converting a value of the field.
+    """
+    field_type = target_field.type
+    if field_type is str:
+        return lambda value: {"S": value}
+    if field_type is int:
+        return lambda value: {"N": str(value)}
+    if field_type is bool:
+        return lambda value: {"BOOL": value}
+    if field_type in {JobStatus, StateSavePolicy}:
+        return lambda value: {"S": value.name}
+    return _SERIALIZER.serialize
+
+
+def _get_field_converter(target_field: Field) -> Callable[[Any], Any]:
+    """Get the function converting a deserialized DynamoDB value to the value of a `JobMetadata` field.
+
+    Args:
+        target_field (Field): The field of `JobMetadata`.
+
+    Raises:
+        ValueError: If the type of the field is not supported.
+
+    Returns:
+        Callable[[Any], Any]: The function converting a non-null value.
+    """
+    field_type = target_field.type
+    field_type_args = get_args(field_type)
+    if field_type is JobStatus:
+        return lambda value: JobStatus[value]
+    if field_type is StateSavePolicy:
+        return lambda value: StateSavePolicy[value]
+    if datetime in field_type_args:
+        return datetime.fromisoformat
+    if timestamp_pb2.Timestamp in field_type_args:
+        return _timestamp_from_isoformat
+    if field_type in {bool, str} or {bool, str} & set(field_type_args):
+        return _identity
+    if field_type is int or int in field_type_args:
+        return int
+    if field_type is float or float in field_type_args:
+        return float
+
+    msg = f"Unsupported type for field {target_field.name}: {field_type}"
+    raise ValueError(msg)
+
+
+# Names of the fields of `JobMetadata` and the functions converting them to and from DynamoDB, resolved once.
+_JOB_METADATA_FIELDS: tuple[tuple[str, Callable[[Any], dict[str, Any]], Callable[[Any], Any]], ...] = tuple(
+    (class_field.name, _get_field_serializer(class_field), _get_field_converter(class_field))
+    for class_field in fields(JobMetadata)
+)
@@ -1,10 +1,21 @@
 """Job priority module."""
 
+import math
 import sys
+from collections.abc import Container
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import cached_property
 
+# Natural logarithm of 2, used to compute powers of 2 as `math.exp(-_LN2 * x)`.
+_LN2 = math.log(2)
+
+# Maximum timeouts and role factors keyed by lowercase role. Other roles are treated as guests.
+_ROLE_MAX_TIMEOUTS = {"admin": timedelta(minutes=60), "developer": timedelta(minutes=10)}
+_DEFAULT_ROLE_MAX_TIMEOUT = timedelta(minutes=5)
+_ROLE_FACTORS = {"admin": 1.0, "developer": 0.5}
+_DEFAULT_ROLE_FACTOR = 0.0
+
 
 @dataclass(frozen=True)
 class PriorityFactorWeights:
@@ -25,15 +36,14 @@ def get_role_max_timeout(role: str) -> timedelta:
     Returns:
         timedelta: The maximum timeout for the given role.
     """
-    role = role.lower()
-    if role == "admin":
-        return timedelta(minutes=60)
-    if role == "developer":
-        return timedelta(minutes=10)
-    return timedelta(minutes=5)
+    # Roles are usually lowercase already, so lowercasing is only needed on a miss.
+    max_timeout = _ROLE_MAX_TIMEOUTS.get(role)
+    if max_timeout is None:
+        max_timeout = _ROLE_MAX_TIMEOUTS.get(role.lower(), _DEFAULT_ROLE_MAX_TIMEOUT)
+    return max_timeout
 
 
-@dataclass
+@dataclass(slots=True)
 class BurstScoreInfo:
     """Current burst score and the datetime when this score was last updated."""
 
@@ -51,6 +61,8 @@ class BurstScoreManager:
             burst_score_half_life (timedelta): Half-life time for burst scores.
         """
         self.burst_score_half_life = burst_score_half_life
+        # Coefficient such that `math.exp(coefficient * elapsed_seconds)` is the decay rate of burst scores.
+        self._decay_coefficient = -_LN2 / burst_score_half_life.total_seconds()
         self.token_burst_scores: dict[str, BurstScoreInfo] = {}
 
     def update_burst_score(self, token: str, current_time: datetime) -> None:
@@ -65,10 +77,10 @@ class BurstScoreManager:
         if burst_info is None:
             self.token_burst_scores[token] = BurstScoreInfo(burst_score=1.0, last_updated_at=current_time)
         else:
-            elapsed_time = current_time - burst_info.last_updated_at
-            decay_rate = 2 ** -(elapsed_time / self.burst_score_half_life)
-            new_score = burst_info.burst_score * decay_rate + 1
-            self.token_burst_scores[token] = BurstScoreInfo(burst_score=new_score, last_updated_at=current_time)
+            elapsed_seconds = (current_time - burst_info.last_updated_at).total_seconds()
+            decay_rate = math.exp(self._decay_coefficient * elapsed_seconds)
+            burst_info.burst_score = burst_info.burst_score * decay_rate + 1
+            burst_info.last_updated_at = current_time
 
     def get_burst_score(self, token: str) -> float:
         """Get the burst score of the given token.
@@ -86,6 +98,33 @@ class BurstScoreManager:
 
         return burst_info.burst_score
 
+    def prune(self, current_time: datetime, threshold: float = 1e-3, tokens_to_keep: Container[str] = ()) -> int:
+        """Remove the burst scores that have decayed below the given threshold.
+
+        The next update of a removed token sets its burst score to 1.0 instead of adding 1.0 to the decayed score,
+        so the threshold bounds the difference caused by pruning.
+
+        Args:
+            current_time (datetime): Current time.
+            threshold (float): Decayed burst score below which the entry of a token is removed.
+            tokens_to_keep (Container[str]): Tokens whose entries are kept regardless of their scores.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        decay_coefficient = self._decay_coefficient
+        pruned_tokens = [
+            token
+            for token, burst_info in self.token_burst_scores.items()
+            if token not in tokens_to_keep
+            and burst_info.burst_score
+            * math.exp(decay_coefficient * (current_time - burst_info.last_updated_at).total_seconds())
+            < threshold
+        ]
+        for token in pruned_tokens:
+            del self.token_burst_scores[token]
+        return len(pruned_tokens)
+
 
 def calc_role_factor(role: str) -> float:
     """Calculate the role factor.
@@ -96,12 +135,10 @@ def calc_role_factor(role: str) -> float:
     Returns:
         float: Role factor of the job.
     """
-    role = role.lower()
-    if role == "admin":
-        return 1.0
-    if role == "developer":
-        return 0.5
-    return 0.0
+    role_factor = _ROLE_FACTORS.get(role)
+    if role_factor is None:
+        role_factor = _ROLE_FACTORS.get(role.lower(), _DEFAULT_ROLE_FACTOR)
+    return role_factor
 
 
 def calc_timeout_factor(timeout: timedelta, role_max_timeout: timedelta) -> float:
@@ -123,20 +160,16 @@ def calc_timeout_factor(timeout: timedelta, role_max_timeout: timedelta) -> floa
     return 1 - timeout_seconds / max_timeout_seconds
 
 
-def calc_age_factor(current_time: datetime, queued_at: datetime, max_age: timedelta) -> float:
+def calc_age_factor(waiting_seconds: float, max_age_seconds: float) -> float:
     """Calculate the age factor.
 
     Args:
-        current_time (datetime): Current time.
-        queued_at (datetime): Queued time of the job.
-        max_age (timedelta): Maximum waiting time used to normalize the waiting time of the job.
+        waiting_seconds (float): Waiting time of the job in seconds.
+        max_age_seconds (float): Maximum waiting time in seconds used to normalize the waiting time of the job.
 
     Returns:
         float: Age factor of the job.
     """
-    waiting_seconds = (current_time - queued_at).total_seconds()
-    max_age_seconds = max_age.total_seconds()
-
     if max_age_seconds <= 0 or waiting_seconds > max_age_seconds:
         return 1.0
 
@@ -157,12 +190,15 @@ def calc_fair_share_factor(burst_score: float, burst_penalty: float) -> float:
         return 0.0
     if burst_score <= 1:
         return 1.0
-    return 2 ** (-((burst_score - 1) / burst_penalty))
+    return math.exp(-_LN2 * (burst_score - 1) / burst_penalty)
 
 
 class JobPriority:
     """Job priority class."""
 
+    # `__dict__` is kept for the `bytes` cached property, and is only allocated when it is accessed.
+    __slots__ = ("__dict__", "_base_priority", "_queued_at_ts", "_token")
+
     factor_weights: PriorityFactorWeights = PriorityFactorWeights(
         timeout_factor=1000, role_factor=0, age_factor=2000, fair_share_factor=1000
     )
@@ -194,7 +230,8 @@ class JobPriority:
             timeout (timedelta): Timeout of the job.
         """
         self._token = token
-        self._queued_at = queued_at
+        # POSIX timestamp of the queued time, so that ranking the job only needs float arithmetic.
+        self._queued_at_ts = queued_at.timestamp()
         self._base_priority = self._calc_base_priority(
             role=role,
             timeout=timeout,
@@ -217,35 +254,61 @@ class JobPriority:
             timeout=timeout, role_max_timeout=role_max_timeout
         )
 
-    def calc_priority(self, current_time: datetime, max_age: timedelta) -> float:
+    def calc_priority(self, current_ts: float, max_age_seconds: float) -> float:
         """Calculate the job priority as the weighted sum of multiple factors.
 
         Args:
-            current_time (datetime): Current time.
-            max_age (timedelta): Maximum waiting time used to calculate the age factor.
+            current_ts (float): Current time as a POSIX timestamp.
+            max_age_seconds (float): Maximum waiting time in seconds used to calculate the age factor.
+
+        Returns:
+            float: Priority of the job.
+        """
+        return self.calc_priority_with(
+            fair_share_factor=self.get_fair_share_factor(), current_ts=current_ts, max_age_seconds=max_age_seconds
+        )
+
+    def calc_priority_with(self, fair_share_factor: float, current_ts: float, max_age_seconds: float) -> float:
+        """Calculate the job priority with the given fair share factor.
+
+        This lets callers ranking several jobs of the same token compute the fair share factor once.
+
+        Args:
+            fair_share_factor (float): Fair share factor of the job token.
+            current_ts (float): Current time as a POSIX timestamp.
+            max_age_seconds (float): Maximum waiting time in seconds used to calculate the age factor.
 
         Returns:
             float: Priority of the job.
         """
-        burst_score = self.burst_score_manager.get_burst_score(token=self._token)
         w_age_factor = self.factor_weights.age_factor
         w_fair_share_factor = self.factor_weights.fair_share_factor
         return (
             self._base_priority
-            + w_age_factor * calc_age_factor(current_time=current_time, queued_at=self._queued_at, max_age=max_age)
-            + w_fair_share_factor * calc_fair_share_factor(burst_score=burst_score, burst_penalty=self.burst_penalty)
+            + w_age_factor
+            * calc_age_factor(waiting_seconds=current_ts - self._queued_at_ts, max_age_seconds=max_age_seconds)
+            + w_fair_share_factor * fair_share_factor
         )
 
-    def get_waiting_time(self, current_time: datetime) -> timedelta:
-        """Return the waiting time of the job.
+    def get_fair_share_factor(self) -> float:
+        """Return the fair share factor from the current burst score of the job token.
+
+        Returns:
+            float: Fair share factor of the job token.
+        """
+        burst_score = self.burst_score_manager.get_burst_score(token=self._token)
+        return calc_fair_share_factor(burst_score=burst_score, burst_penalty=self.burst_penalty)
+
+    def get_waiting_seconds(self, current_ts: float) -> float:
+        """Return the waiting time of the job in seconds.
 
         Args:
-            current_time (datetime): Current time.
+            current_ts (float): Current time as a POSIX timestamp.
 
         Returns:
-            timedelta: The waiting time of the job.
+            float: The waiting time of the job in seconds.
         """
-        return current_time - self._queued_at
+        return current_ts - self._queued_at_ts
 
     @cached_property
     def bytes(self) -> int:
@@ -257,7 +320,7 @@ class JobPriority:
         return (
             sys.getsizeof(self)
             + sys.getsizeof(self._token)
-            + sys.getsizeof(self._queued_at)
+            + sys.getsizeof(self._queued_at_ts)
             + sys.getsizeof(self._base_priority)
         )
 
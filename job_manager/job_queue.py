@@ -1,11 +1,12 @@
 """Job queue module."""
 
+import math
 import sys
-from collections import OrderedDict, defaultdict
-from collections.abc import Iterable
-from dataclasses import dataclass
+import time
+from collections import defaultdict
+from collections.abc import Container, Iterable
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from functools import cached_property
 from itertools import islice
 
 from pb.mqc3_cloud.program.v1 import quantum_program_pb2
@@ -13,35 +14,45 @@ from utility import get_current_datetime
 
 from .job_priority import JobPriority, JobPriorityFactory, PriorityFactorWeights
 
+# Number of pops between removals of the burst scores that have decayed away.
+BURST_SCORE_PRUNE_INTERVAL = 1000
 
-@dataclass
+
+@dataclass(slots=True)
 class JobQueueEntry:
     """Job queue entry class."""
 
     token: str
     program: quantum_program_pb2.QuantumProgram
     priority: JobPriority
-
-    @cached_property
-    def bytes(self) -> int:
-        """Return the size of the job queue entry object in bytes.
-
-        Returns:
-            int: The size of the job queue entry object in bytes.
-        """
-        return sys.getsizeof(self) + sys.getsizeof(self.token) + self.program.ByteSize() + sys.getsizeof(self.priority)
-
-    def calc_priority(self, current_time: datetime, max_age: timedelta) -> float:
+    # Serialized size of the program in bytes, or None to compute it from the program.
+    program_size: int | None = None
+    # POSIX timestamp after which the job exceeds the maximum waiting time of the queue.
+    deadline_ts: float = math.inf
+    # Size of the job queue entry in bytes, including the token, the program and the job priority.
+    bytes: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Compute the size of the job queue entry."""
+        program_size = self.program.ByteSize() if self.program_size is None else self.program_size
+        self.bytes = _JOB_QUEUE_ENTRY_SIZE + sys.getsizeof(self.token) + program_size + _JOB_PRIORITY_SIZE
+
+    def calc_priority(self, current_ts: float, max_age_seconds: float) -> float:
         """Calculate the priority of the job.
 
         Args:
-            current_time (datetime): Current time.
-            max_age (timedelta): Maximum waiting time used to calculate the age factor.
+            current_ts (float): Current time as a POSIX timestamp.
+            max_age_seconds (float): Maximum waiting time in seconds used to calculate the age factor.
 
         Returns:
             float: The priority of the job.
         """
-        return self.priority.calc_priority(current_time=current_time, max_age=max_age)
+        return self.priority.calc_priority(current_ts=current_ts, max_age_seconds=max_age_seconds)
+
+
+# `sys.getsizeof` of job queue entries and job priorities, which depends only on their classes.
+_JOB_QUEUE_ENTRY_SIZE = sys.getsizeof(object.__new__(JobQueueEntry))
+_JOB_PRIORITY_SIZE = sys.getsizeof(object.__new__(JobPriority))
 
 
 class JobQueue:
@@ -72,8 +83,12 @@ class JobQueue:
         self.max_concurrent_jobs_per_token: dict[str, int] = max_concurrent_jobs_per_token or {}
 
         self.current_bytes: int = 0
-        self.jobs: OrderedDict[str, JobQueueEntry] = OrderedDict()
+        self.jobs: dict[str, JobQueueEntry] = {}
         self.token_job_counts: dict[str, int] = defaultdict(int)
+        # Tokens whose burst scores are never pruned. The burst scores are shared by all queues, so
+        # `JobQueueContainer` replaces this with the tokens that have jobs in any of its queues.
+        self.burst_score_tokens_to_keep: Container[str] = self.token_job_counts
+        self._pops_since_burst_score_prune: int = 0
 
         self.job_priority_factory = JobPriorityFactory(
             factor_weights=PriorityFactorWeights(
@@ -92,6 +107,7 @@ class JobQueue:
         role: str,
         queued_at: datetime,
         timeout: timedelta,
+        program_size: int | None = None,
     ) -> bool:
         """Push a job onto the job queue.
 
@@ -102,6 +118,8 @@ class JobQueue:
             role (str): The role of the job submitter.
             queued_at (datetime): The time when the job was queued.
             timeout (timedelta): Timeout of the job.
+            program_size (int | None): Serialized size of the program in bytes if the caller already knows it.
+                It is computed from the program otherwise.
 
         Raises:
             ValueError: If the job ID already exists in the queue.
@@ -113,14 +131,25 @@ class JobQueue:
             msg = f"Failed to push job {job_id}: Job ID already exists."
             raise ValueError(msg)
 
-        if (
-            role in self.max_concurrent_jobs_per_token
-            and self.token_job_counts[token] >= self.max_concurrent_jobs_per_token[role]
-        ):
+        # `get` keeps a rejected token from leaving a zero count behind in `token_job_counts`.
+        max_concurrent_jobs = self.max_concurrent_jobs_per_token.get(role)
+        if max_concurrent_jobs is not None and self.token_job_counts.get(token, 0) >= max_concurrent_jobs:
+            return False
+
+        # The program alone not fitting rules out the job before allocating its priority and entry.
+        if program_size is None:
+            program_size = program.ByteSize()
+        if self.current_bytes + program_size > self.capacity_bytes:
             return False
 
         job_priority = self.job_priority_factory.create(token=token, role=role, queued_at=queued_at, timeout=timeout)
-        job = JobQueueEntry(token=token, program=program, priority=job_priority)
+        job = JobQueueEntry(
+            token=token,
+            program=program,
+            priority=job_priority,
+            program_size=program_size,
+            deadline_ts=queued_at.timestamp() + self.max_waiting_time_per_job.total_seconds(),
+        )
 
         if self.current_bytes + job.bytes > self.capacity_bytes:
             return False
@@ -142,35 +171,53 @@ class JobQueue:
         if not self.jobs:
             return None
 
-        num_jobs_to_consider = min(self.max_jobs_to_consider, len(self.jobs))
-        candidate_job_ids = list(islice(self.jobs.keys(), num_jobs_to_consider))
+        if len(self.jobs) == 1 or self.max_jobs_to_consider <= 1:
+            # A single candidate is popped without ranking.
+            job_id = next(iter(self.jobs))
+        else:
+            job_id = self._select_job_to_pop()
 
-        current_time = get_current_datetime()
+        job = self._discard_job(job_id)
 
-        earliest_exceeding_job_id = None
+        self._pops_since_burst_score_prune += 1
+        if self._pops_since_burst_score_prune >= BURST_SCORE_PRUNE_INTERVAL:
+            self._pops_since_burst_score_prune = 0
+            JobPriority.burst_score_manager.prune(
+                current_time=get_current_datetime(), tokens_to_keep=self.burst_score_tokens_to_keep
+            )
+        return job_id, job.program
 
-        for job_id in candidate_job_ids:
-            waiting_time = self.jobs[job_id].priority.get_waiting_time(current_time=current_time)
-            if waiting_time > self.max_waiting_time_per_job and earliest_exceeding_job_id is None:
-                earliest_exceeding_job_id = job_id
+    def _select_job_to_pop(self) -> str:
+        """Select the job to pop among the first `max_jobs_to_consider` jobs of the non-empty queue.
 
-        if earliest_exceeding_job_id is not None:
-            job_id = earliest_exceeding_job_id
-        else:
-            # Find the highest priority job
-            job_id = max(
-                candidate_job_ids,
-                key=lambda job_id: self.jobs[job_id].calc_priority(
-                    current_time=current_time, max_age=self.max_waiting_time_per_job
-                ),
+        Returns:
+            str: The ID of the earliest job exceeding the maximum waiting time, or else of the highest priority job.
+        """
+        current_ts = time.time()
+        max_age_seconds = self.max_waiting_time_per_job.total_seconds()
+
+        # Find the earliest job exceeding the maximum waiting time, or else the highest priority job,
+        # in a single pass over the candidates.
+        job_id = ""
+        highest_priority = -math.inf
+        # Fair share factors of the tokens seen in this pass, as candidates often share a token.
+        fair_share_factors: dict[str, float] = {}
+        for candidate_job_id, candidate in islice(self.jobs.items(), self.max_jobs_to_consider):
+            if current_ts > candidate.deadline_ts:
+                job_id = candidate_job_id
+                break
+            fair_share_factor = fair_share_factors.get(candidate.token)
+            if fair_share_factor is None:
+                fair_share_factor = candidate.priority.get_fair_share_factor()
+                fair_share_factors[candidate.token] = fair_share_factor
+            priority = candidate.priority.calc_priority_with(
+                fair_share_factor=fair_share_factor, current_ts=current_ts, max_age_seconds=max_age_seconds
             )
+            if priority > highest_priority:
+                highest_priority = priority
+                job_id = candidate_job_id
 
-        job = self.jobs.pop(job_id)
-        self.current_bytes -= job.bytes
-        self.token_job_counts[job.token] -= 1
-        if self.token_job_counts[job.token] == 0:
-            del self.token_job_counts[job.token]
-        return job_id, job.program
+        return job_id
 
     def try_remove(self, job_id: str) -> bool:
         """Remove a job from the queue.
@@ -184,12 +231,49 @@ class JobQueue:
         if job_id not in self.jobs:
             return False
 
+        self._discard_job(job_id)
+        return True
+
+    def _discard_job(self, job_id: str) -> JobQueueEntry:
+        """Remove a job from the queue and release its accounting.
+
+        Args:
+            job_id (str): The job ID, which must exist in the queue.
+
+        Returns:
+            JobQueueEntry: The removed job queue entry.
+        """
         job = self.jobs.pop(job_id)
         self.current_bytes -= job.bytes
-        self.token_job_counts[job.token] -= 1
-        if self.token_job_counts[job.token] == 0:
+        remaining_jobs = self.token_job_counts[job.token] - 1
+        if remaining_jobs > 0:
+            self.token_job_counts[job.token] = remaining_jobs
+        else:
             del self.token_job_counts[job.token]
-        return True
+        return job
+
+
+class _TokensInQueues:
+    """Tokens that have jobs in any of the given queues."""
+
+    def __init__(self, queues: Iterable[JobQueue]) -> None:
+        """Initialize the tokens.
+
+        Args:
+            queues (Iterable[JobQueue]): The job queues.
+        """
+        self._queues = list(queues)
+
+    def __contains__(self, token: object) -> bool:
+        """Check if a token has jobs in any of the queues.
+
+        Args:
+            token (object): The token.
+
+        Returns:
+            bool: True if the token has jobs in any of the queues.
+        """
+        return any(token in queue.token_job_counts for queue in self._queues)
 
 
 class JobQueueContainer:
@@ -243,6 +327,11 @@ class JobQueueContainer:
                 for backend in backends
             }
 
+        # A pop from any queue may prune the shared burst scores, which must keep the tokens queued elsewhere.
+        tokens_in_queues = _TokensInQueues(self.queues.values())
+        for queue in self.queues.values():
+            queue.burst_score_tokens_to_keep = tokens_in_queues
+
     def __getitem__(self, key: str) -> JobQueue:
         """Get a queue by key.
 
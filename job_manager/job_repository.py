@@ -1,10 +1,16 @@
 """Uploading inputs and results of jobs to S3 bucket."""
 
+import gzip
 import logging
+import threading
+import time
+import zlib
+from http import HTTPStatus
 
 import boto3
 from botocore.client import Config
 from botocore.exceptions import ClientError
+from google.protobuf.message import DecodeError
 from google.protobuf.timestamp_pb2 import Timestamp
 from job_manager.job_metadata import JobMetadata
 from pb.mqc3_cloud.program.v1 import quantum_program_pb2
@@ -14,6 +20,64 @@ logger = logging.getLogger(__name__)
 
 UPLOAD_URL_EXPIRATION_TIME = 3600 * 3  # 3 hours
 DOWNLOAD_URL_EXPIRATION_TIME = 180  # 3 minutes
+# A generated download URL is returned again while at least this many seconds of its validity remain.
+DOWNLOAD_URL_REUSE_MIN_REMAINING_SECONDS = 60
+DOWNLOAD_URL_CACHE_MAX_ENTRIES = 10_000
+# gzip compression level of job inputs. Level 1 already shrinks repeated field tags and numeric arrays well
+# while keeping compression cheap next to the upload.
+JOB_INPUT_COMPRESSION_LEVEL = 1
+# Job inputs smaller than this many serialized bytes are stored uncompressed, where compression saves little.
+JOB_INPUT_COMPRESSION_MIN_BYTES = 64 * 1024
+# Number of bytes read at a time when downloading a job input into a preallocated buffer.
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+
+def _input_key(job_id: str) -> str:
+    """Return the S3 key of the uncompressed input of a job.
+
+    Args:
+        job_id (str): ID of the job.
+
+    Returns:
+        str: The S3 key.
+    """
+    return job_id + ".in.proto"
+
+
+def _compressed_input_key(job_id: str) -> str:
+    """Return the S3 key of the input of a job compressed with gzip.
+
+    Args:
+        job_id (str): ID of the job.
+
+    Returns:
+        str: The S3 key.
+    """
+    return job_id + ".in.proto.gz"
+
+
+def _output_key(job_id: str) -> str:
+    """Return the S3 key of the result of a job.
+
+    Args:
+        job_id (str): ID of the job.
+
+    Returns:
+        str: The S3 key.
+    """
+    return job_id + ".out.proto.gz"
+
+
+def _input_tagging(job_metadata: JobMetadata) -> str:
+    """Return the tags of the input of a job as a URL-encoded query string.
+
+    Args:
+        job_metadata (JobMetadata): Metadata of the job.
+
+    Returns:
+        str: The tags of the input.
+    """
+    return f"token_role={job_metadata.role}&save_job={str(job_metadata.save_job).lower()}&upload-status=complete"
 
 
 class JobRepository:
@@ -25,6 +89,8 @@ class JobRepository:
         bucket_name: str,
         aws_credentials: AWSCredentials,
         s3_max_attempts: int = 3,
+        s3_max_pool_connections: int = 128,
+        use_transfer_acceleration: bool = False,
     ) -> None:
         """Initialize JobRepository object.
 
@@ -32,6 +98,10 @@ class JobRepository:
             bucket_name (str): S3 bucket name
             aws_credentials (AWSCredentials): AWS credentials
             s3_max_attempts (int): The maximum number of attempts for each S3 operation.
+            s3_max_pool_connections (int): The maximum number of connections kept in the S3 connection pool.
+                This should not be smaller than the number of threads calling S3 concurrently.
+            use_transfer_acceleration (bool): Whether to use the S3 Transfer Acceleration endpoint.
+                The bucket must have Transfer Acceleration enabled, and a custom endpoint URL cannot be used.
         """
         self.bucket_name = bucket_name
 
@@ -43,31 +113,61 @@ class JobRepository:
             region_name=aws_credentials.region_name,
             config=Config(
                 signature_version="s3v4",
-                s3={"addressing_style": "virtual"},
+                s3={"addressing_style": "virtual", "use_accelerate_endpoint": use_transfer_acceleration},
                 retries={"total_max_attempts": s3_max_attempts, "mode": "standard"},
+                max_pool_connections=s3_max_pool_connections,
+                tcp_keepalive=True,
+                connect_timeout=3,
+                read_timeout=10,
             ),
         )
 
+        # Mapping from (job ID, expires_in) to the monotonic time when the download URL expires,
+        # the URL, and its expiration time in seconds since the epoch.
+        self._download_url_cache: dict[tuple[str, int], tuple[float, str, int]] = {}
+        self._download_url_cache_lock = threading.Lock()
+        # Whether the bucket exists, or None until `bucket_exists` gets a definite answer.
+        self._bucket_exists: bool | None = None
+
     def bucket_exists(self) -> bool:
         """Check if the S3 bucket exists.
 
+        A definite answer is cached, so only the first call sends a request.
+
         Returns:
             bool: True if the S3 bucket exists, False otherwise.
         """
+        if self._bucket_exists is not None:
+            return self._bucket_exists
+
         try:
             logger.info("Checking if S3 bucket exists (bucket name: %s).", self.bucket_name)
             self.s3.head_bucket(Bucket=self.bucket_name)
-        except self.s3.exceptions.NoSuchBucket:
+        except ClientError as e:
+            # `head_bucket` has no response body, so a missing bucket is only reported by the status code.
+            status_code = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if status_code == HTTPStatus.NOT_FOUND:
+                self._bucket_exists = False
+                return False
+            if status_code == HTTPStatus.FORBIDDEN:
+                logger.warning("No permission to access S3 bucket (bucket name: %s).", self.bucket_name)
+                self._bucket_exists = True
+                return True
+            logger.exception("Failed to check if S3 bucket exists (bucket name: %s).", self.bucket_name)
             return False
         except Exception:
             logger.exception("Failed to check if S3 bucket exists (bucket name: %s).", self.bucket_name)
             return False
 
+        self._bucket_exists = True
         return True
 
     def generate_upload_url(self, job_id: str, expires_in: int = UPLOAD_URL_EXPIRATION_TIME) -> tuple[str, Timestamp]:
         """Generate a presigned URL for uploading the result of a job.
 
+        The tags of the result are not signed into the URL, since a signed `x-amz-tagging` header would have to be
+        sent by the uploader. They are put by `put_tags_to_result` when the job is finalized instead.
+
         Args:
             job_id (str): ID of the job
             expires_in (int): Time in seconds until the generated URL expires.
@@ -78,16 +178,14 @@ class JobRepository:
         Raises:
             ClientError: If the presigned URL could not be generated.
         """
-        expires_at = Timestamp()
-        expires_at.GetCurrentTime()
-        expires_at.FromSeconds(expires_at.seconds + expires_in)
+        expires_at = Timestamp(seconds=int(time.time()) + expires_in)
         try:
-            logger.info("Generating a presigned URL for uploading the result (job ID: %s).", job_id)
+            logger.debug("Generating a presigned URL for uploading the result (job ID: %s).", job_id)
             url = self.s3.generate_presigned_url(
                 ClientMethod="put_object",
                 Params={
                     "Bucket": self.bucket_name,
-                    "Key": f"{job_id}.out.proto.gz",
+                    "Key": _output_key(job_id),
                     "ContentType": "application/protobuf",
                     "ContentEncoding": "gzip",
                     "ContentDisposition": "attachment",
@@ -106,6 +204,9 @@ class JobRepository:
     ) -> tuple[str, Timestamp]:
         """Generate a presigned URL for downloading the result of a job.
 
+        Clients poll for results, so a URL generated for the same job and `expires_in` is reused while
+        at least `DOWNLOAD_URL_REUSE_MIN_REMAINING_SECONDS` of its validity remain.
+
         Args:
             job_id (str): ID of the job
             expires_in (int): Time in seconds until the generated URL expires.
@@ -116,16 +217,21 @@ class JobRepository:
         Raises:
             ClientError: If the presigned URL could not be generated.
         """
-        expires_at = Timestamp()
-        expires_at.GetCurrentTime()
-        expires_at.FromSeconds(expires_at.seconds + expires_in)
+        cache_key = (job_id, expires_in)
+        now = time.monotonic()
+        with self._download_url_cache_lock:
+            cached = self._download_url_cache.get(cache_key)
+        if cached is not None and cached[0] - now >= DOWNLOAD_URL_REUSE_MIN_REMAINING_SECONDS:
+            return cached[1], Timestamp(seconds=cached[2])
+
+        expires_at = Timestamp(seconds=int(time.time()) + expires_in)
         try:
-            logger.info("Generating a presigned URL for downloading the result (job ID: %s)", job_id)
+            logger.debug("Generating a presigned URL for downloading the result (job ID: %s)", job_id)
             url = self.s3.generate_presigned_url(
                 ClientMethod="get_object",
                 Params={
                     "Bucket": self.bucket_name,
-                    "Key": f"{job_id}.out.proto.gz",
+                    "Key": _output_key(job_id),
                 },
                 ExpiresIn=expires_in,
                 HttpMethod="GET",
@@ -134,6 +240,14 @@ class JobRepository:
             logger.exception("Failed to generate a presigned URL for downloading the result (job ID: %s).", job_id)
             raise
 
+        with self._download_url_cache_lock:
+            if (
+                cache_key not in self._download_url_cache
+                and len(self._download_url_cache) >= DOWNLOAD_URL_CACHE_MAX_ENTRIES
+            ):
+                # Evict the oldest entry.
+                del self._download_url_cache[next(iter(self._download_url_cache))]
+            self._download_url_cache[cache_key] = (now + expires_in, url, expires_at.seconds)
         return url, expires_at
 
     def put_tags_to_result(self, job_id: str, *, token_role: str, save_job: bool) -> None:
@@ -149,10 +263,10 @@ class JobRepository:
         """
         try:
             # `upload-status` tag is used to control one-time uploads via a presigned URL.
-            logger.info("Putting tags to the job result (job ID: %s).", job_id)
+            logger.debug("Putting tags to the job result (job ID: %s).", job_id)
             self.s3.put_object_tagging(
                 Bucket=self.bucket_name,
-                Key=f"{job_id}.out.proto.gz",
+                Key=_output_key(job_id),
                 Tagging={
                     "TagSet": [
                         {"Key": "token_role", "Value": token_role},
@@ -168,44 +282,109 @@ class JobRepository:
             logger.exception("Failed to put tags to the job result (job ID: %s).", job_id)
             raise
 
-    def upload_job_input(self, program: quantum_program_pb2.QuantumProgram, job_metadata: JobMetadata) -> None:
+    def upload_job_input(self, program: quantum_program_pb2.QuantumProgram, job_metadata: JobMetadata) -> int:
         """Upload the input of a job to S3.
 
+        A serialized program of at least `JOB_INPUT_COMPRESSION_MIN_BYTES` is compressed with gzip and stored
+        with the `.gz` suffix, like the result of a job. Smaller programs are stored as serialized.
+
         Args:
             program (quantum_program_pb2.QuantumProgram): Program to upload.
             job_metadata (JobMetadata): Metadata of the job.
+
+        Returns:
+            int: Size of the serialized program in bytes.
+
+        Raises:
+            ClientError: If the upload fails.
         """
+        body = program.SerializeToString()
+        if len(body) >= JOB_INPUT_COMPRESSION_MIN_BYTES:
+            object_params = {
+                "Key": _compressed_input_key(job_metadata.job_id),
+                "Body": gzip.compress(body, compresslevel=JOB_INPUT_COMPRESSION_LEVEL, mtime=0),
+                "ContentEncoding": "gzip",
+            }
+        else:
+            object_params = {"Key": _input_key(job_metadata.job_id), "Body": body}
         try:
-            logger.info("Uploading the job input (job ID: %s).", job_metadata.job_id)
+            logger.debug("Uploading the job input (job ID: %s).", job_metadata.job_id)
             self.s3.put_object(
                 Bucket=self.bucket_name,
-                Key=f"{job_metadata.job_id}.in.proto",
-                Body=program.SerializeToString(),
                 ContentType="application/protobuf",
                 ContentDisposition="attachment",
-                Tagging=f"token_role={job_metadata.role}&save_job={str(job_metadata.save_job).lower()}&upload-status=complete",
+                Tagging=_input_tagging(job_metadata),
+                **object_params,
             )
 
         except ClientError:
             logger.exception("Failed to upload the job input (job ID: %s).", job_metadata.job_id)
+            raise
+        return len(body)
 
     def download_job_input(self, job_id: str) -> quantum_program_pb2.QuantumProgram | None:
         """Download the input of a job from S3.
 
+        The uncompressed input is tried first, and the input compressed with gzip if it does not exist.
+
         Args:
             job_id (str): ID of the job.
 
         Returns:
-            QuantumProgram | None: Deserialized program, or None if the download failed.
+            QuantumProgram | None: Deserialized program, or None if the download failed or the input is corrupt.
         """
         try:
-            logger.info("Downloading the input of the job (job ID: %s).", job_id)
-            response = self.s3.get_object(
-                Bucket=self.bucket_name,
-                Key=f"{job_id}.in.proto",
-            )
-            return quantum_program_pb2.QuantumProgram.FromString(response["Body"].read())
+            logger.debug("Downloading the input of the job (job ID: %s).", job_id)
+            try:
+                response = self.s3.get_object(
+                    Bucket=self.bucket_name,
+                    Key=_input_key(job_id),
+                )
+                serialized_program = self._read_body(response)
+            except self.s3.exceptions.NoSuchKey:
+                response = self.s3.get_object(
+                    Bucket=self.bucket_name,
+                    Key=_compressed_input_key(job_id),
+                )
+                serialized_program = gzip.decompress(self._read_body(response))
+            program = quantum_program_pb2.QuantumProgram()
+            program.ParseFromString(serialized_program)
+            return program
 
         except ClientError:
             logger.exception("Failed to download the job input (job ID: %s).", job_id)
             return None
+        except (OSError, EOFError, zlib.error, DecodeError):
+            logger.exception("Failed to read the corrupt job input (job ID: %s).", job_id)
+            return None
+
+    @staticmethod
+    def _read_body(response: dict) -> bytes | bytearray:
+        """Read the body of a `get_object` response.
+
+        If the content length is known, the body is read in chunks into a single preallocated buffer
+        instead of joining all chunks into another copy at the end.
+
+        Args:
+            response (dict): Response of `get_object`.
+
+        Returns:
+            bytes | bytearray: The body of the object.
+        """
+        body = response["Body"]
+        content_length = response.get("ContentLength")
+        if not content_length:
+            return body.read()
+
+        buf = bytearray(content_length)
+        view = memoryview(buf)
+        offset = 0
+        while offset < content_length:
+            chunk = body.read(min(DOWNLOAD_CHUNK_SIZE, content_length - offset))
+            if not chunk:
+                break
+            view[offset : offset + len(chunk)] = chunk
+            offset += len(chunk)
+        if offset < content_length:
+            return bytes(view[:offset])
+        return buf
@@ -23,6 +23,13 @@ class StatusMessage:
     message: str = ""
 
 
+# Pairs of status code and message template by key, extracted from the error definitions once.
+_STATUS_TEMPLATES: dict[str, tuple[str, str]] = {
+    key: (data["code"], data["message"]) for key, data in _MESSAGES.items()
+}
+_UNKNOWN_STATUS_MESSAGE = StatusMessage(code="UNKNOWN", message="An unknown error occurred.")
+
+
 def get_status_message(key: str, **kwargs: str) -> StatusMessage:
     """Get status code and message for a given key.
 
@@ -33,13 +40,14 @@ def get_status_message(key: str, **kwargs: str) -> StatusMessage:
     Returns:
         StatusMessage: The status code and message.
     """
-    try:
-        data = _MESSAGES[key]
-        code = data["code"]
-        message = data["message"]
+    template = _STATUS_TEMPLATES.get(key)
+    if template is None:
+        return _UNKNOWN_STATUS_MESSAGE
 
-        formatted_message = message.format(**kwargs)
+    code, message = template
+    try:
+        formatted_message = message.format_map(kwargs)
     except KeyError:
-        return StatusMessage(code="UNKNOWN", message="An unknown error occurred.")
+        return _UNKNOWN_STATUS_MESSAGE
 
     return StatusMessage(code=code, message=formatted_message)
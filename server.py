@@ -5,10 +5,13 @@ import logging
 import os
 import threading
 from concurrent import futures
-from copy import deepcopy
+from dataclasses import replace
 
 import boto3
 import grpc
+from botocore.client import BaseClient
+from botocore.config import Config
+from google.protobuf.internal import api_implementation
 from grpc_health.v1 import health, health_pb2_grpc
 
 from backend_manager.backend_manager import BackendManager
@@ -25,8 +28,16 @@ logging.basicConfig(level=logging.INFO, format=log_format)
 
 logger = logging.getLogger(__name__)
 
+# The handlers call JobManager and boto3 synchronously, so each in-flight RPC occupies a worker thread.
 SCHEDULER_SUBMISSION_MAX_WORKERS = int(os.getenv("SCHEDULER_SUBMISSION_MAX_WORKERS", "100"))
 SCHEDULER_EXECUTION_MAX_WORKERS = int(os.getenv("SCHEDULER_EXECUTION_MAX_WORKERS", "10"))
+# RPCs beyond these limits are rejected with RESOURCE_EXHAUSTED instead of waiting in the unbounded executor queue.
+SCHEDULER_SUBMISSION_MAX_CONCURRENT_RPCS = int(
+    os.getenv("SCHEDULER_SUBMISSION_MAX_CONCURRENT_RPCS", str(SCHEDULER_SUBMISSION_MAX_WORKERS * 4))
+)
+SCHEDULER_EXECUTION_MAX_CONCURRENT_RPCS = int(
+    os.getenv("SCHEDULER_EXECUTION_MAX_CONCURRENT_RPCS", str(SCHEDULER_EXECUTION_MAX_WORKERS * 4))
+)
 SCHEDULER_SUBMISSION_MAX_MESSAGE_LENGTH = int(
     os.getenv("SCHEDULER_SUBMISSION_MAX_MESSAGE_LENGTH", str(10 * 1024 * 1024))  # 10 MB
 )
@@ -40,32 +51,50 @@ SCHEDULER_MAX_CONCURRENT_JOBS_GUEST = int(os.getenv("SCHEDULER_MAX_CONCURRENT_JO
 SCHEDULER_MAX_JOB_BYTES_ADMIN = int(os.getenv("SCHEDULER_MAX_JOB_BYTES_ADMIN", str(10 * 1024 * 1024)))  # 10MB
 SCHEDULER_MAX_JOB_BYTES_DEVELOPER = int(os.getenv("SCHEDULER_MAX_JOB_BYTES_DEVELOPER", str(10 * 1024 * 1024)))  # 10MB
 SCHEDULER_MAX_JOB_BYTES_GUEST = int(os.getenv("SCHEDULER_MAX_JOB_BYTES_GUEST", str(1024 * 1024)))  # 1MB
+SCHEDULER_BACKEND_STATUS_CACHE_TTL_SECONDS = float(os.getenv("SCHEDULER_BACKEND_STATUS_CACHE_TTL_SECONDS", "10"))
 
 
-def get_ssm_parameter(name: str, aws_credentials: AWSCredentials) -> str:
-    """Get SSM parameter value.
+def build_ssm_client(aws_credentials: AWSCredentials) -> BaseClient:
+    """Build an SSM client shared by the lookups of the SSM parameters.
 
     Args:
-        name (str): The name of the SSM parameter.
         aws_credentials (AWSCredentials): AWS credentials.
 
     Returns:
-        str: The value of the SSM parameter.
-
-    Raises:
-        ValueError: If the parameter is not found in SSM.
-        RuntimeError: If there is a failure retrieving the SSM parameter.
+        BaseClient: The SSM client.
     """
-    logger.debug("Getting SSM parameter (name: %s, credentials: %s).", name, aws_credentials)
-
-    ssm_client = boto3.client(
+    logger.debug("Building an SSM client (credentials: %s).", aws_credentials)
+    return boto3.client(
         "ssm",
         endpoint_url=aws_credentials.endpoint_url,
         aws_access_key_id=aws_credentials.access_key_id,
         aws_secret_access_key=aws_credentials.secret_access_key,
         region_name=aws_credentials.region_name,
+        config=Config(
+            max_pool_connections=16,
+            tcp_keepalive=True,
+            connect_timeout=3,
+            retries={"total_max_attempts": 3, "mode": "standard"},
+        ),
     )
 
+
+def get_ssm_parameter(name: str, ssm_client: BaseClient) -> str:
+    """Get SSM parameter value.
+
+    Args:
+        name (str): The name of the SSM parameter.
+        ssm_client (BaseClient): The SSM client built by `build_ssm_client`.
+
+    Returns:
+        str: The value of the SSM parameter.
+
+    Raises:
+        ValueError: If the parameter is not found in SSM.
+        RuntimeError: If there is a failure retrieving the SSM parameter.
+    """
+    logger.debug("Getting SSM parameter (name: %s).", name)
+
     try:
         response = ssm_client.get_parameter(
             Name=name,
@@ -103,6 +132,14 @@ def serve(args: argparse.Namespace) -> None:
     if aws_credentials.endpoint_url:
         logger.debug("Using AWS endpoint '%s'.", aws_credentials.endpoint_url)
 
+    # Programs are serialized and parsed for every job, which is far slower in the pure-Python implementation.
+    protobuf_implementation = api_implementation.Type()
+    logger.info("Using the '%s' protobuf implementation.", protobuf_implementation)
+    if protobuf_implementation == "python":
+        logger.warning(
+            "The pure-Python protobuf implementation is in use. Install a protobuf wheel with the upb implementation."
+        )
+
     # Check if required arguments are provided
     if not args.job_bucket_name_key:
         msg = "Job bucket name key is not provided."
@@ -113,41 +150,62 @@ def serve(args: argparse.Namespace) -> None:
         logger.error(msg)
         raise ValueError(msg)
 
+    ssm_client = build_ssm_client(aws_credentials)
+
     # Get job_bucket_name from SSM parameter store
-    job_bucket_name = get_ssm_parameter(args.job_bucket_name_key, aws_credentials)
+    job_bucket_name = get_ssm_parameter(args.job_bucket_name_key, ssm_client)
 
     if not job_bucket_name:
         msg = "Job bucket name is empty."
         logger.error(msg)
         raise ValueError(msg)
 
-    s3_aws_credentials = deepcopy(aws_credentials)
-    if args.dev and args.s3_endpoint:
-        s3_aws_credentials.endpoint_url = args.s3_endpoint
+    s3_aws_credentials = (
+        replace(aws_credentials, endpoint_url=args.s3_endpoint) if args.dev and args.s3_endpoint else aws_credentials
+    )
     if s3_aws_credentials.endpoint_url:
         logger.debug("Using S3 endpoint URL '%s'.", s3_aws_credentials.endpoint_url)
 
-    job_repository = JobRepository(bucket_name=job_bucket_name, aws_credentials=s3_aws_credentials)
+    job_repository = JobRepository(
+        bucket_name=job_bucket_name,
+        aws_credentials=s3_aws_credentials,
+        # Both servers call S3 from their worker threads.
+        s3_max_pool_connections=SCHEDULER_SUBMISSION_MAX_WORKERS + SCHEDULER_EXECUTION_MAX_WORKERS,
+        use_transfer_acceleration=args.s3_transfer_acceleration,
+    )
     # Check the connection to S3.
     if not job_repository.bucket_exists():
         logger.error("S3 bucket does not exist (bucket name: %s).", job_bucket_name)
 
+    max_job_bytes = {
+        "admin": SCHEDULER_MAX_JOB_BYTES_ADMIN,
+        "developer": SCHEDULER_MAX_JOB_BYTES_DEVELOPER,
+        "guest": SCHEDULER_MAX_JOB_BYTES_GUEST,
+    }
     server_submission_option = [
         ("grpc.max_send_message_length", SCHEDULER_SUBMISSION_MAX_MESSAGE_LENGTH),
-        ("grpc.max_receive_message_length", SCHEDULER_SUBMISSION_MAX_MESSAGE_LENGTH),
+        # A request larger than every role's limit is rejected by gRPC before it is parsed.
+        (
+            "grpc.max_receive_message_length",
+            min(SCHEDULER_SUBMISSION_MAX_MESSAGE_LENGTH, max(max_job_bytes.values())),
+        ),
     ]
     server_execution_option = [
         ("grpc.max_send_message_length", SCHEDULER_EXECUTION_MAX_MESSAGE_LENGTH),
         ("grpc.max_receive_message_length", SCHEDULER_EXECUTION_MAX_MESSAGE_LENGTH),
     ]
 
+    # The services are kept on separate servers so that the execution service, which hands out jobs,
+    # is never reachable through the port exposed to the submitters.
     server_submission = grpc.server(
         futures.ThreadPoolExecutor(SCHEDULER_SUBMISSION_MAX_WORKERS),
         options=server_submission_option,
+        maximum_concurrent_rpcs=SCHEDULER_SUBMISSION_MAX_CONCURRENT_RPCS,
     )
     server_execution = grpc.server(
         futures.ThreadPoolExecutor(SCHEDULER_EXECUTION_MAX_WORKERS),
         options=server_execution_option,
+        maximum_concurrent_rpcs=SCHEDULER_EXECUTION_MAX_CONCURRENT_RPCS,
     )
 
     logger.info("Load the backend status from SSM (key: %s).", args.backend_status_parameter_name)
@@ -155,11 +213,12 @@ def serve(args: argparse.Namespace) -> None:
         status_parameter_name=args.backend_status_parameter_name,
         aws_credentials=aws_credentials,
         unify_backends=args.unify_backends,
+        status_cache_ttl_seconds=SCHEDULER_BACKEND_STATUS_CACHE_TTL_SECONDS,
+        background_refresh=True,
     )
-    backend_manager_lock = threading.RLock()
 
     logger.info("Get a DynamoDB job table name from SSM (key: %s).", args.job_table_name_key)
-    dynamodb_table_name = get_ssm_parameter(args.job_table_name_key, aws_credentials)
+    dynamodb_table_name = get_ssm_parameter(args.job_table_name_key, ssm_client)
 
     job_manager = JobManager(
         queue_capacity_bytes=SCHEDULER_MAX_QUEUE_BYTES,
@@ -174,20 +233,15 @@ def serve(args: argparse.Namespace) -> None:
         supported_backends=backend_manager.get_all_backends(),
         unify_backends=args.unify_backends,
     )
-    job_manager_lock = threading.RLock()
+    job_manager_lock = threading.Lock()
 
     submission_pb2_grpc.add_SubmissionServiceServicer_to_server(
         servicer=SubmissionServer(
             address_to_token_database=args.address_to_token_database,
             backend_manager=backend_manager,
-            backend_manager_lock=backend_manager_lock,
             job_manager=job_manager,
             job_manager_lock=job_manager_lock,
-            max_job_bytes={
-                "admin": SCHEDULER_MAX_JOB_BYTES_ADMIN,
-                "developer": SCHEDULER_MAX_JOB_BYTES_DEVELOPER,
-                "guest": SCHEDULER_MAX_JOB_BYTES_GUEST,
-            },
+            max_job_bytes=max_job_bytes,
         ),
         server=server_submission,
     )
@@ -199,17 +253,19 @@ def serve(args: argparse.Namespace) -> None:
         server=server_execution,
     )
 
+    # Both health servicers only notify watchers from this pool, so one thread serves them both.
+    health_thread_pool = futures.ThreadPoolExecutor(1)
     health_pb2_grpc.add_HealthServicer_to_server(
         servicer=health.HealthServicer(
             experimental_non_blocking=True,
-            experimental_thread_pool=futures.ThreadPoolExecutor(1),
+            experimental_thread_pool=health_thread_pool,
         ),
         server=server_submission,
     )
     health_pb2_grpc.add_HealthServicer_to_server(
         servicer=health.HealthServicer(
             experimental_non_blocking=True,
-            experimental_thread_pool=futures.ThreadPoolExecutor(1),
+            experimental_thread_pool=health_thread_pool,
         ),
         server=server_execution,
     )
@@ -245,6 +301,11 @@ def get_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument("--job_table_name_key", default=os.getenv("DYNAMODB_JOB_TABLE_NAME_KEY", ""))
     parser.add_argument("--backend_status_parameter_name", default=os.getenv("BACKEND_STATUS_PARAMETER_NAME", ""))
     parser.add_argument("--unify_backends", action="store_true")
+    parser.add_argument(
+        "--s3_transfer_acceleration",
+        action="store_true",
+        help="Access S3 through the Transfer Acceleration endpoint. The bucket must have it enabled.",
+    )
     parser.add_argument("--dev", action="store_true", help="Run in development mode")
     parser.add_argument(
         "--endpoint",
@@ -267,5 +328,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
     if not args.dev and (args.endpoint or args.s3_endpoint):
         parser.error("--endpoint/--s3_endpoint can only be used with --dev")
+    if args.s3_transfer_acceleration and args.dev and (args.endpoint or args.s3_endpoint):
+        parser.error("--s3_transfer_acceleration cannot be used with --endpoint/--s3_endpoint")
 
     serve(args)
@@ -14,33 +14,53 @@ from pb.mqc3_cloud.scheduler.v1 import (
     job_pb2,
 )
 
-# Logging configuration
-log_format = "%(asctime)s - %(levelname)-8s - %(message)s - %(filename)s:%(lineno)d"
-logging.basicConfig(level=logging.INFO, format=log_format)
-
 logger = logging.getLogger(__name__)
 
+# Statuses of jobs whose upload URL can be refreshed.
+_REFRESHABLE_JOB_STATUSES = frozenset({JobStatus.QUEUED, JobStatus.RUNNING})
+# Responses to `RefreshUploadUrl` whose fields never change, shared across calls. They must not be mutated.
+_INTERNAL_ERROR_STATUS = get_status_message(key="INTERNAL_ERROR")
+_REFRESH_UPLOAD_URL_INTERNAL_ERROR = execution_pb2.RefreshUploadUrlResponse(
+    error=error_detail_pb2.ErrorDetail(
+        code=_INTERNAL_ERROR_STATUS.code,
+        description=_INTERNAL_ERROR_STATUS.message,
+    )
+)
+_INVALID_JOB_STATUS = get_status_message(key="INVALID_REQUEST", reason="Job status is not QUEUED or RUNNING.")
+_REFRESH_UPLOAD_URL_INVALID_JOB_STATUS = execution_pb2.RefreshUploadUrlResponse(
+    error=error_detail_pb2.ErrorDetail(
+        code=_INVALID_JOB_STATUS.code,
+        description=_INVALID_JOB_STATUS.message,
+    )
+)
+
+# Number of locks serializing the finalization of jobs. A job uses the lock selected by the hash of its ID.
+FINALIZE_LOCK_SHARDS = 32
+
 
 class ExecutionServer(execution_pb2_grpc.ExecutionService):
     """Server class for the execution service in scheduler."""
 
     job_manager: JobManager
-    job_manager_lock: threading.RLock
+    job_manager_lock: threading.Lock
 
     def __init__(
         self,
         job_manager: JobManager,
-        job_manager_lock: threading.RLock,
+        job_manager_lock: threading.Lock,
     ) -> None:
         """Constructor of ExecutionServer.
 
         Args:
             job_manager (JobManager): Job manager.
-            job_manager_lock (threading.RLock): Lock.
+            job_manager_lock (threading.Lock): Lock.
         """
         super().__init__()
         self.job_manager = job_manager
         self.job_manager_lock = job_manager_lock
+        # Finalizing a job touches only that job's metadata, S3 object and DynamoDB item, and no job queue,
+        # so it is serialized per job instead of holding `job_manager_lock` during its I/O.
+        self._finalize_locks = [threading.Lock() for _ in range(FINALIZE_LOCK_SHARDS)]
 
     def AssignNextJob(
         self, request: execution_pb2.AssignNextJobRequest, _: grpc.RpcContext
@@ -54,8 +74,9 @@ class ExecutionServer(execution_pb2_grpc.ExecutionService):
         Returns:
             execution_pb2.AssignNextJobResponse:  The next job sent to the physical laboratory.
         """
-        with self.job_manager_lock:
-            next_job = self.job_manager.fetch_next_job_to_execute(request)
+        # Only popping from the queue needs the lock. Metadata and the upload URL of the popped job are
+        # retrieved without blocking submissions and other assignments.
+        next_job = self.job_manager.fetch_next_job_to_execute(request, queue_lock=self.job_manager_lock)
 
         if next_job.job_id:
             logger.info(
@@ -79,7 +100,7 @@ class ExecutionServer(execution_pb2_grpc.ExecutionService):
             execution_pb2.ReportExecutionResultResponse: The response including error details when this request failed.
         """
         logger.debug("Reporting the execution result (job ID: %s).", request.job_id)
-        with self.job_manager_lock:
+        with self._finalize_locks[hash(request.job_id) % FINALIZE_LOCK_SHARDS]:
             return self.job_manager.finalize_job(request)
 
     def RefreshUploadUrl(
@@ -94,22 +115,15 @@ class ExecutionServer(execution_pb2_grpc.ExecutionService):
         Returns:
             execution_pb2.RefreshUploadUrlResponse: The response including new upload URL and its expiration time.
         """
+        # Neither the status check nor the URL signing needs `job_manager_lock`, so refreshes run concurrently
+        # with each other and with job assignment.
         # Check the current job status
         try:
-            logger.info("Retrieving the job metadata (job ID: %s).", request.job_id)
+            logger.debug("Retrieving the job metadata (job ID: %s).", request.job_id)
             job_metadata = self.job_manager.get_job_metadata(request.job_id)
-            if job_metadata.status not in {JobStatus.QUEUED, JobStatus.RUNNING}:
-                status_message = get_status_message(
-                    key="INVALID_REQUEST",
-                    reason="Job status is not QUEUED or RUNNING.",
-                )
+            if job_metadata.status not in _REFRESHABLE_JOB_STATUSES:
                 logger.info("Job status is not QUEUED or RUNNING (job ID: %s).", request.job_id)
-                return execution_pb2.RefreshUploadUrlResponse(
-                    error=error_detail_pb2.ErrorDetail(
-                        code=status_message.code,
-                        description=status_message.message,
-                    )
-                )
+                return _REFRESH_UPLOAD_URL_INVALID_JOB_STATUS
         except ValueError as e:
             logger.info(str(e))
             status_message = get_status_message(key="JOB_NOT_FOUND", job_id=request.job_id)
@@ -121,28 +135,16 @@ class ExecutionServer(execution_pb2_grpc.ExecutionService):
             )
         except Exception:
             logger.exception("Failed to retrieve the job metadata (job ID: %s).", request.job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return execution_pb2.RefreshUploadUrlResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return _REFRESH_UPLOAD_URL_INTERNAL_ERROR
 
         try:
             logger.debug("Generating a new upload URL (job ID: %s).", request.job_id)
             upload_url, expires_at = self.job_manager.get_job_result_upload_url(request.job_id)
         except Exception:
             logger.exception("Failed to generate a new upload URL (job ID: %s).", request.job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return execution_pb2.RefreshUploadUrlResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return _REFRESH_UPLOAD_URL_INTERNAL_ERROR
 
-        logger.info("Successfully refreshed the upload URL (job ID: %s).", request.job_id)
+        logger.debug("Successfully refreshed the upload URL (job ID: %s).", request.job_id)
         return execution_pb2.RefreshUploadUrlResponse(
             upload_target=job_pb2.JobResultUploadTarget(
                 upload_url=upload_url,
@@ -2,7 +2,9 @@
 
 import logging
 import threading
+import time
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 import grpc
 from backend_manager.backend_manager import BackendAvailability, BackendManager
@@ -16,15 +18,29 @@ from pb.mqc3_cloud.scheduler.v1 import (
     submission_pb2,
     submission_pb2_grpc,
 )
-from utility import get_current_datetime
-
-# Logging configuration
-log_format = "%(asctime)s - %(levelname)-8s - %(message)s - %(filename)s:%(lineno)d"
-logging.basicConfig(level=logging.INFO, format=log_format)
 
 logger = logging.getLogger(__name__)
 
 
+def _build_error_detail(key: str) -> error_detail_pb2.ErrorDetail:
+    """Build the error detail of a status message without placeholders.
+
+    Args:
+        key (str): Key of the status message.
+
+    Returns:
+        error_detail_pb2.ErrorDetail: The error detail.
+    """
+    status_message = get_status_message(key=key)
+    return error_detail_pb2.ErrorDetail(code=status_message.code, description=status_message.message)
+
+
+# Error details that never change, built once. Responses copy them, so they are never mutated.
+_INTERNAL_ERROR_DETAIL = _build_error_detail("INTERNAL_ERROR")
+_SERVER_UNAVAILABLE_DETAIL = _build_error_detail("SERVER_UNAVAILABLE")
+_CRITICAL_ERROR_DETAIL = _build_error_detail("CRITICAL_ERROR")
+
+
 @dataclass
 class BackendStatusResult:
     """Result wrapper for backend availability resolution.
@@ -48,20 +64,22 @@ class BackendStatusResult:
 
 
 class SubmissionServer(submission_pb2_grpc.SubmissionService):
-    """Server class for the submission service in scheduler."""
+    """Server class for the submission service in scheduler.
+
+    Handlers block on the token database, DynamoDB and S3, and run on the thread pool of the gRPC server.
+    """
 
     address_to_token_database: str
     job_manager: JobManager
-    job_manager_lock: threading.RLock
+    job_manager_lock: threading.Lock
 
     def __init__(  # noqa: PLR0913
         self,
         *,
         address_to_token_database: str,
         backend_manager: BackendManager,
-        backend_manager_lock: threading.RLock,
         job_manager: JobManager,
-        job_manager_lock: threading.RLock,
+        job_manager_lock: threading.Lock,
         max_job_bytes: dict[str, int],
     ) -> None:
         """Constructor of SubmissionServer.
@@ -69,15 +87,13 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
         Args:
             address_to_token_database (str): the Address to token database server.
             backend_manager (BackendManager): Backend manager.
-            backend_manager_lock (threading.RLock): Lock.
             job_manager (JobManager): Job manager.
-            job_manager_lock (threading.RLock): Lock.
+            job_manager_lock (threading.Lock): Lock.
             max_job_bytes (dict[str, int]): Role to maximum byte size of submission job.
         """
         super().__init__()
         self.address_to_token_database = address_to_token_database
         self.backend_manager = backend_manager
-        self.backend_manager_lock = backend_manager_lock
         self.job_manager = job_manager
         self.job_manager_lock = job_manager_lock
         self.max_job_bytes = max_job_bytes
@@ -99,9 +115,8 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
         if not token:
             return None, "Token is empty."
 
-        # Get token information from token database
+        # Get token information from token database. Each RPC already logs the token at DEBUG level before this.
         try:
-            logger.info("Retrieving the token info from the token database (token: %s).", token)
             token_info = get_token_info(self.address_to_token_database, token)
         except TokenDatabaseError as e:
             msg = f"Failed to verify token (token: {token})."
@@ -112,7 +127,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             return None, f"Token is not found (token: {token})."
 
         # token is expired
-        if token_info.is_expired(get_current_datetime()):
+        if token_info.is_expired_at(time.time()):
             return None, f"Token is expired (token: {token})."
 
         return token_info, ""
@@ -123,32 +138,26 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
         Returns:
             BackendStatusResult: Contains either a valid availability or an error.
         """
-        with self.backend_manager_lock:
-            try:
-                return BackendStatusResult(
-                    availability=self.backend_manager.get_backend_availability(backend, role),
-                    error=None,
-                )
-            except ValueError as e:
-                logger.info(str(e))
-                status_message = get_status_message(key="INVALID_REQUEST", reason=str(e))
-                return BackendStatusResult(
-                    availability=None,
-                    error=error_detail_pb2.ErrorDetail(
-                        code=status_message.code,
-                        description=status_message.message,
-                    ),
-                )
-            except Exception:
-                logger.exception("Failed to resolve the service status (backend: %s, role: %s).", backend, role)
-                status_message = get_status_message(key="CRITICAL_ERROR")
-                return BackendStatusResult(
-                    availability=None,
-                    error=error_detail_pb2.ErrorDetail(
-                        code=status_message.code,
-                        description=status_message.message,
-                    ),
-                )
+        # `BackendManager` publishes the parsed status by replacing a single attribute and serializes refreshes
+        # internally, so lookups need no lock.
+        try:
+            return BackendStatusResult(
+                availability=self.backend_manager.get_backend_availability(backend, role),
+                error=None,
+            )
+        except ValueError as e:
+            logger.info(str(e))
+            status_message = get_status_message(key="INVALID_REQUEST", reason=str(e))
+            return BackendStatusResult(
+                availability=None,
+                error=error_detail_pb2.ErrorDetail(
+                    code=status_message.code,
+                    description=status_message.message,
+                ),
+            )
+        except Exception:
+            logger.exception("Failed to resolve the service status (backend: %s, role: %s).", backend, role)
+            return BackendStatusResult(availability=None, error=_CRITICAL_ERROR_DETAIL)
 
     def SubmitJob(  # noqa: PLR0911
         self,
@@ -169,13 +178,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             token_info, error_message = self.__verify_token(request.token)
         except TokenDatabaseError:
             logger.exception("Failed to verify token due to token database error.")
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return submission_pb2.SubmitJobResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return submission_pb2.SubmitJobResponse(error=_INTERNAL_ERROR_DETAIL)
 
         if token_info is None:
             logger.info(error_message)
@@ -188,14 +191,12 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             )
 
         logger.debug("Checking the job byte size (role: %s).", token_info.role)
-        byte_size = len(request.SerializeToString())
-        if token_info.role in self.max_job_bytes and self.max_job_bytes[token_info.role] < byte_size:
+        byte_size = request.ByteSize()
+        max_job_bytes = self.max_job_bytes.get(token_info.role)
+        if max_job_bytes is not None and max_job_bytes < byte_size:
             status_message = get_status_message(
                 key="INVALID_REQUEST",
-                reason=(
-                    f"Byte size of request ({byte_size}) "
-                    f"exceeds the allowed limit ({self.max_job_bytes[token_info.role]})"
-                ),
+                reason=f"Byte size of request ({byte_size}) exceeds the allowed limit ({max_job_bytes})",
             )
             return submission_pb2.SubmitJobResponse(
                 error=error_detail_pb2.ErrorDetail(
@@ -209,19 +210,14 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
 
         if service_status.error is not None:
             return submission_pb2.SubmitJobResponse(error=service_status.error)
-        assert service_status.availability is not None  # noqa: S101
+        availability = service_status.availability
+        if TYPE_CHECKING:
+            # `availability` is set whenever `error` is None. Narrowed for type checkers only.
+            assert availability is not None  # noqa: S101
 
-        if service_status.availability.status != submission_pb2.ServiceStatus.SERVICE_STATUS_AVAILABLE:
-            logger.info(
-                "Service is not available (role: %s, status: %s).", token_info.role, service_status.availability.status
-            )
-            status_message = get_status_message(key="SERVER_UNAVAILABLE")
-            return submission_pb2.SubmitJobResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+        if availability.status != submission_pb2.ServiceStatus.SERVICE_STATUS_AVAILABLE:
+            logger.info("Service is not available (role: %s, status: %s).", token_info.role, availability.status)
+            return submission_pb2.SubmitJobResponse(error=_SERVER_UNAVAILABLE_DETAIL)
 
         logger.debug("Adding a job request to the job manager.")
         # Add the job to job manager.
@@ -259,13 +255,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             token_info, error_message = self.__verify_token(request.token)
         except TokenDatabaseError:
             logger.exception("Failed to verify token due to token database error.")
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return submission_pb2.GetJobStatusResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return submission_pb2.GetJobStatusResponse(error=_INTERNAL_ERROR_DETAIL)
         if token_info is None:
             logger.info(error_message)
             status_message = get_status_message(key="INVALID_TOKEN", reason=error_message)
@@ -277,7 +267,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             )
 
         try:
-            logger.info("Retrieving the job metadata (job ID: %s).", request.job_id)
+            logger.debug("Retrieving the job metadata (job ID: %s).", request.job_id)
             metadata = self.job_manager.get_job_metadata(job_id=request.job_id)
         except ValueError as e:
             logger.info(str(e))
@@ -290,13 +280,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             )
         except Exception:
             logger.exception("Failed to retrieve the job metadata (job ID: %s).", request.job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return submission_pb2.GetJobStatusResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return submission_pb2.GetJobStatusResponse(error=_INTERNAL_ERROR_DETAIL)
 
         logger.info("Successfully retrieved the job status (job ID: %s).", request.job_id)
         return submission_pb2.GetJobStatusResponse(
@@ -327,13 +311,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             token_info, error_message = self.__verify_token(request.token)
         except TokenDatabaseError:
             logger.exception("Failed to verify token due to token database error.")
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return submission_pb2.GetJobResultResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return submission_pb2.GetJobResultResponse(error=_INTERNAL_ERROR_DETAIL)
         if token_info is None:
             logger.info(error_message)
             status_message = get_status_message(key="INVALID_TOKEN", reason=error_message)
@@ -345,7 +323,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             )
 
         try:
-            logger.info("Retrieving the job metadata (job ID: %s).", request.job_id)
+            logger.debug("Retrieving the job metadata (job ID: %s).", request.job_id)
             metadata = self.job_manager.get_job_metadata(job_id=request.job_id)
         except ValueError as e:
             logger.info(str(e))
@@ -358,13 +336,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             )
         except Exception:
             logger.exception("Failed to retrieve the job metadata (job ID: %s).", request.job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return submission_pb2.GetJobResultResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return submission_pb2.GetJobResultResponse(error=_INTERNAL_ERROR_DETAIL)
 
         if metadata.status != JobStatus.COMPLETED:
             description = (
@@ -384,13 +356,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             result_url, _expires_at = self.job_manager.get_job_result_download_url(job_id=request.job_id)
         except Exception:
             logger.exception("Failed to generate the download URL (job ID: %s).", request.job_id)
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return submission_pb2.GetJobResultResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return submission_pb2.GetJobResultResponse(error=_INTERNAL_ERROR_DETAIL)
         result = job_pb2.JobResult(result_url=result_url)
 
         logger.info("Successfully retrieved the job result (job ID: %s).", request.job_id)
@@ -423,13 +389,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             token_info, error_message = self.__verify_token(request.token)
         except TokenDatabaseError:
             logger.exception("Failed to verify token due to token database error.")
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return submission_pb2.CancelJobResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return submission_pb2.CancelJobResponse(error=_INTERNAL_ERROR_DETAIL)
         if token_info is None:
             logger.info(error_message)
             status_message = get_status_message(key="INVALID_TOKEN", reason=error_message)
@@ -476,13 +436,7 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
             token_info, error_message = self.__verify_token(request.token)
         except TokenDatabaseError:
             logger.exception("Failed to verify token due to token database error.")
-            status_message = get_status_message(key="INTERNAL_ERROR")
-            return submission_pb2.GetServiceStatusResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+            return submission_pb2.GetServiceStatusResponse(error=_INTERNAL_ERROR_DETAIL)
         if token_info is None:
             logger.info(error_message)
             status_message = get_status_message(key="INVALID_TOKEN", reason=error_message)
@@ -498,22 +452,17 @@ class SubmissionServer(submission_pb2_grpc.SubmissionService):
 
         if service_status.error is not None:
             return submission_pb2.GetServiceStatusResponse(error=service_status.error)
-        assert service_status.availability is not None  # noqa: S101
+        availability = service_status.availability
+        if TYPE_CHECKING:
+            # `availability` is set whenever `error` is None. Narrowed for type checkers only.
+            assert availability is not None  # noqa: S101
 
-        if service_status.availability.status != submission_pb2.ServiceStatus.SERVICE_STATUS_AVAILABLE:
-            logger.info(
-                "Service is not available (role: %s, status: %s).", token_info.role, service_status.availability.status
-            )
-            status_message = get_status_message(key="SERVER_UNAVAILABLE")
-            return submission_pb2.GetServiceStatusResponse(
-                error=error_detail_pb2.ErrorDetail(
-                    code=status_message.code,
-                    description=status_message.message,
-                )
-            )
+        if availability.status != submission_pb2.ServiceStatus.SERVICE_STATUS_AVAILABLE:
+            logger.info("Service is not available (role: %s, status: %s).", token_info.role, availability.status)
+            return submission_pb2.GetServiceStatusResponse(error=_SERVER_UNAVAILABLE_DETAIL)
 
         logger.info("Service is available (role: %s).", token_info.role)
         return submission_pb2.GetServiceStatusResponse(
-            status=service_status.availability.status,
-            description=service_status.availability.description,
+            status=availability.status,
+            description=availability.description,
         )
@@ -1,6 +1,7 @@
 """Common module for tests."""
 
 import sys
+from functools import cache
 from pathlib import Path
 from typing import cast
 
@@ -64,14 +65,28 @@ def construct_sample_settings() -> job_pb2.JobExecutionSettings:
 
 
 def create_dynamodb_client() -> DynamoDBClient:
+    return _create_dynamodb_client(
+        SAMPLE_AWS_CREDENTIALS.endpoint_url,
+        SAMPLE_AWS_CREDENTIALS.access_key_id,
+        SAMPLE_AWS_CREDENTIALS.secret_access_key,
+        SAMPLE_AWS_CREDENTIALS.region_name,
+    )
+
+
+# Building a client loads the service model, so one client is shared per set of credentials.
+# moto intercepts requests of clients created before a mock starts, so sharing does not leak state between tests.
+@cache
+def _create_dynamodb_client(
+    endpoint_url: str | None, access_key_id: str | None, secret_access_key: str | None, region_name: str | None
+) -> DynamoDBClient:
     return cast(
         "DynamoDBClient",
         boto3.client(
             "dynamodb",
-            endpoint_url=SAMPLE_AWS_CREDENTIALS.endpoint_url,
-            aws_access_key_id=SAMPLE_AWS_CREDENTIALS.access_key_id,
-            aws_secret_access_key=SAMPLE_AWS_CREDENTIALS.secret_access_key,
-            region_name=SAMPLE_AWS_CREDENTIALS.region_name,
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            region_name=region_name,
         ),
     )
 
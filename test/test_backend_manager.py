@@ -1,6 +1,7 @@
 """Tests for BackendManager."""
 
 import sys
+import time
 from pathlib import Path
 
 import pytest
@@ -72,7 +73,11 @@ description = "ready"
         value=initial_status_toml,
     )
 
-    manager = BackendManager(status_parameter_name=status_parameter_name, aws_credentials=SAMPLE_AWS_CREDENTIALS)
+    manager = BackendManager(
+        status_parameter_name=status_parameter_name,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+        status_cache_ttl_seconds=0,
+    )
 
     mocker.patch.object(
         BackendManager,
@@ -97,7 +102,11 @@ description = "ready"
         value=initial_status_toml,
     )
 
-    manager = BackendManager(status_parameter_name=status_parameter_name, aws_credentials=SAMPLE_AWS_CREDENTIALS)
+    manager = BackendManager(
+        status_parameter_name=status_parameter_name,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+        status_cache_ttl_seconds=0,
+    )
     # Set an invalid TOML value
     invalid_toml = "not = [valid] = toml"
     set_ssm_parameter(
@@ -108,6 +117,115 @@ description = "ready"
     assert manager._load_backend_status() is None  # noqa: SLF001
 
 
+@mock_aws
+def test_load_status_uses_cache_within_ttl(mocker: MockerFixture):
+    """Test that the backend status is reused within the TTL and reloaded after it expires."""
+    status_parameter_name = "/test/status.toml"
+    set_ssm_parameter(
+        name=status_parameter_name,
+        value="""
+[backends.qpu.admin]
+status = "available"
+description = "ready"
+""",
+    )
+
+    mock_monotonic = mocker.patch("backend_manager.backend_manager.time.monotonic", return_value=100.0)
+    manager = BackendManager(
+        status_parameter_name=status_parameter_name,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+        status_cache_ttl_seconds=10.0,
+    )
+    get_status_toml = mocker.spy(manager, "_get_status_toml")
+
+    # The status validated at construction is reused.
+    assert manager.get_backend_availability("qpu", "admin").description == "ready"
+    assert get_status_toml.call_count == 0
+    set_ssm_parameter(
+        name=status_parameter_name,
+        value="""
+[backends.qpu.admin]
+status = "maintenance"
+description = "under maintenance"
+""",
+    )
+
+    # Within the TTL, the cached status is returned.
+    mock_monotonic.return_value = 109.0
+    assert manager.get_backend_availability("qpu", "admin").description == "ready"
+    assert get_status_toml.call_count == 0
+
+    # After the TTL, the status is reloaded from SSM.
+    mock_monotonic.return_value = 110.0
+    result = manager.get_backend_availability("qpu", "admin")
+    assert result.status == submission_pb2.ServiceStatus.SERVICE_STATUS_MAINTENANCE
+    assert result.description == "under maintenance"
+    assert get_status_toml.call_count == 1
+
+
+@mock_aws
+def test_load_status_uses_expired_cache_on_error(mocker: MockerFixture):
+    """Test that the expired backend status is returned when reloading it fails."""
+    status_parameter_name = "/test/status.toml"
+    set_ssm_parameter(
+        name=status_parameter_name,
+        value="""
+[backends.qpu.admin]
+status = "available"
+description = "ready"
+""",
+    )
+
+    mock_monotonic = mocker.patch("backend_manager.backend_manager.time.monotonic", return_value=100.0)
+    manager = BackendManager(
+        status_parameter_name=status_parameter_name,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+        status_cache_ttl_seconds=10.0,
+    )
+
+    set_ssm_parameter(name=status_parameter_name, value="not = [valid] = toml")
+    mock_monotonic.return_value = 200.0
+    result = manager.get_backend_availability("qpu", "admin")
+    assert result.status == submission_pb2.ServiceStatus.SERVICE_STATUS_AVAILABLE
+    assert result.description == "ready"
+
+
+@mock_aws
+def test_background_refresh_updates_status():
+    """Test that the background refresh picks up a changed status parameter."""
+    status_parameter_name = "/test/status.toml"
+    set_ssm_parameter(
+        name=status_parameter_name,
+        value="""
+[backends.qpu.admin]
+status = "available"
+description = "ready"
+""",
+    )
+
+    manager = BackendManager(
+        status_parameter_name=status_parameter_name,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+        status_cache_ttl_seconds=0.2,
+        background_refresh=True,
+    )
+    try:
+        set_ssm_parameter(
+            name=status_parameter_name,
+            value="""
+[backends.qpu.admin]
+status = "maintenance"
+description = "under maintenance"
+""",
+        )
+        deadline = time.monotonic() + 5
+        while manager.get_backend_availability("qpu", "admin").description != "under maintenance":
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+    finally:
+        manager.stop_background_refresh()
+
+
 @mock_aws
 def test_backend_availability_success():
     """Test successful retrieval of backend status for a known backend and role."""
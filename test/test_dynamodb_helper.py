@@ -5,6 +5,8 @@ from pathlib import Path
 from typing import Any
 
 import pytest
+from botocore.exceptions import ClientError
+from pytest_mock import MockerFixture
 
 sys.path.append(Path(__file__).parents[1].as_posix())
 
@@ -37,6 +39,7 @@ def construct_sample_dynamodb_item(job_id: str, status: JobStatus = JobStatus.UN
 def test_check_dynamodb_table_exists():
     dynamodb_client = create_dynamodb_client()
     table_name = "table name"
+    dynamodb_helper.invalidate_table_cache()
 
     # Check if the table exists before creating the client
     assert not dynamodb_helper.check_table_exists(dynamodb_client=dynamodb_client, table_name=table_name)
@@ -48,6 +51,12 @@ def test_check_dynamodb_table_exists():
     # Check if the table exists with an invalid table name
     assert not dynamodb_helper.check_table_exists(dynamodb_client=dynamodb_client, table_name="invalid table name")
 
+    # The existence of the table is remembered until the cache is invalidated
+    dynamodb_client.delete_table(TableName=table_name)
+    assert dynamodb_helper.check_table_exists(dynamodb_client=dynamodb_client, table_name=table_name)
+    dynamodb_helper.invalidate_table_cache()
+    assert not dynamodb_helper.check_table_exists(dynamodb_client=dynamodb_client, table_name=table_name)
+
 
 @mock_aws
 def test_put_item():
@@ -146,6 +155,25 @@ def test_get_items_by_large_datasets():
     assert all(item["status"]["S"] == "COMPLETED" for item in result)
 
 
+@mock_aws
+def test_get_items_by_status_with_projection():
+    dynamodb_client = create_dynamodb_client()
+    table_name = "table name"
+    create_dynamodb_table(table_name)
+
+    num_queued = 3
+    for i in range(num_queued):
+        item = construct_sample_dynamodb_item(job_id=f"job{i}", status=JobStatus.QUEUED)
+        dynamodb_helper.put_item(dynamodb_client, table_name, item)
+
+    result = dynamodb_helper.get_items_by_status(
+        dynamodb_client=dynamodb_client, table_name=table_name, status=JobStatus.QUEUED.name, projection="job_id"
+    )
+
+    assert sorted(item["job_id"]["S"] for item in result) == [f"job{i}" for i in range(num_queued)]
+    assert all(set(item.keys()) == {"job_id"} for item in result)
+
+
 @mock_aws
 def test_update_item():
     dynamodb_client = create_dynamodb_client()
@@ -178,6 +206,67 @@ def test_update_item():
             update_values={"physical_lab_version": "1.0.0"},
         )
 
+    # The update conditioned on the status is applied only if the item has the expected status.
+    dynamodb_helper.update_item(
+        dynamodb_client=dynamodb_client,
+        table_name=table_name,
+        job_id=job_id,
+        update_values={"status": JobStatus.FAILED},
+        expected_status=JobStatus.COMPLETED,
+    )
+    assert dynamodb_helper.get_item(dynamodb_client=dynamodb_client, table_name=table_name, job_id=job_id)[
+        "status"
+    ] == {"S": "FAILED"}
+
+    with pytest.raises(ValueError, match=f"The item with job ID {job_id} does not exist in the database or its status"):
+        dynamodb_helper.update_item(
+            dynamodb_client=dynamodb_client,
+            table_name=table_name,
+            job_id=job_id,
+            update_values={"status": JobStatus.RUNNING},
+            expected_status=JobStatus.QUEUED,
+        )
+    assert dynamodb_helper.get_item(dynamodb_client=dynamodb_client, table_name=table_name, job_id=job_id)[
+        "status"
+    ] == {"S": "FAILED"}
+
+
+@mock_aws
+def test_update_items():
+    dynamodb_client = create_dynamodb_client()
+    table_name = "table name"
+    create_dynamodb_table(table_name)
+
+    num_items = dynamodb_helper.TRANSACT_WRITE_MAX_ITEMS + 1
+    for i in range(num_items):
+        item = construct_sample_dynamodb_item(job_id=f"job{i}", status=JobStatus.QUEUED)
+        dynamodb_helper.put_item(dynamodb_client, table_name, item)
+
+    dynamodb_helper.update_items(
+        dynamodb_client=dynamodb_client,
+        table_name=table_name,
+        update_values_by_job_id={
+            f"job{i}": {"status": JobStatus.FAILED.name, "status_code": f"code{i}"} for i in range(num_items)
+        },
+    )
+
+    for i in range(num_items):
+        updated_item = dynamodb_helper.get_item(dynamodb_client, table_name, f"job{i}")
+        assert updated_item["status"] == {"S": "FAILED"}
+        assert updated_item["status_code"] == {"S": f"code{i}"}
+
+    # The transaction including a nonexistent item is cancelled and the existing item is updated alone.
+    dynamodb_helper.update_items(
+        dynamodb_client=dynamodb_client,
+        table_name=table_name,
+        update_values_by_job_id={
+            "job0": {"status": JobStatus.CANCELLED.name},
+            "nonexistent job id": {"status": JobStatus.CANCELLED.name},
+        },
+    )
+    assert dynamodb_helper.get_item(dynamodb_client, table_name, "job0")["status"] == {"S": "CANCELLED"}
+    assert not dynamodb_helper.check_item_exists(dynamodb_client, table_name, "nonexistent job id")
+
 
 @mock_aws
 def test_change_items_status():
@@ -210,3 +299,54 @@ def test_change_items_status():
     assert dynamodb_helper.get_item(dynamodb_client, table_name, "running_job2")["status"] == {"S": "FAILED"}
     assert dynamodb_helper.get_item(dynamodb_client, table_name, "failed_job")["status"] == {"S": "FAILED"}
     assert dynamodb_helper.get_item(dynamodb_client, table_name, "completed_job")["status"] == {"S": "COMPLETED"}
+
+
+@mock_aws
+def test_change_items_status_in_multiple_transactions():
+    dynamodb_client = create_dynamodb_client()
+    table_name = "table name"
+    create_dynamodb_table(table_name)
+
+    num_running = dynamodb_helper.TRANSACT_WRITE_MAX_ITEMS * 2 + 1
+    for i in range(num_running):
+        item = construct_sample_dynamodb_item(job_id=f"job{i}", status=JobStatus.RUNNING)
+        dynamodb_helper.put_item(dynamodb_client, table_name, item)
+
+    dynamodb_helper.change_items_status(
+        dynamodb_client=dynamodb_client,
+        table_name=table_name,
+        old_status=JobStatus.RUNNING,
+        new_status=JobStatus.FAILED,
+    )
+
+    assert dynamodb_helper.get_items_by_status(dynamodb_client, table_name, JobStatus.RUNNING.name) == []
+    assert len(dynamodb_helper.get_items_by_status(dynamodb_client, table_name, JobStatus.FAILED.name)) == num_running
+
+
+@mock_aws
+def test_change_items_status_falls_back_when_transaction_is_cancelled(mocker: MockerFixture):
+    dynamodb_client = create_dynamodb_client()
+    table_name = "table name"
+    create_dynamodb_table(table_name)
+
+    for job_id in ["running_job1", "running_job2"]:
+        item = construct_sample_dynamodb_item(job_id=job_id, status=JobStatus.RUNNING)
+        dynamodb_helper.put_item(dynamodb_client, table_name, item)
+
+    mocker.patch.object(
+        dynamodb_client,
+        "transact_write_items",
+        side_effect=ClientError(
+            error_response={"Error": {"Code": "TransactionCanceledException"}}, operation_name="TransactWriteItems"
+        ),
+    )
+
+    dynamodb_helper.change_items_status(
+        dynamodb_client=dynamodb_client,
+        table_name=table_name,
+        old_status=JobStatus.RUNNING,
+        new_status=JobStatus.FAILED,
+    )
+
+    assert dynamodb_helper.get_item(dynamodb_client, table_name, "running_job1")["status"] == {"S": "FAILED"}
+    assert dynamodb_helper.get_item(dynamodb_client, table_name, "running_job2")["status"] == {"S": "FAILED"}
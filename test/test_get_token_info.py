@@ -0,0 +1,265 @@
+"""Tests for getting token information."""
+
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+sys.path.append(Path(__file__).parents[1].as_posix())
+
+import get_token_info as token_info_module
+from get_token_info import TokenDatabaseError, TokenInfo, get_token_info
+from google.protobuf.timestamp_pb2 import Timestamp
+from pb.mqc3_cloud.token_database.v1 import token_database_pb2
+
+ADDRESS_TOKEN_DB = "token_database:8084"  # noqa: S105
+TOKEN = "token1"  # noqa: S105
+N_CONCURRENT_CALLERS = 8
+
+
+def construct_found_response(
+    role: str = "admin", expires_at: datetime | None = None
+) -> token_database_pb2.GetTokenInfoResponse:
+    """Construct a response of the token database for a token that is found.
+
+    Args:
+        role (str): role of the token
+        expires_at (datetime | None): expiry of the token, or None if the token never expires
+
+    Returns:
+        token_database_pb2.GetTokenInfoResponse: response of the token database
+    """
+    response = token_database_pb2.GetTokenInfoResponse(
+        status=token_database_pb2.DatabaseOperationStatus.DATABASE_OPERATION_STATUS_OK,
+    )
+    response.token_info.role = role
+    response.token_info.name = "user1"
+    if expires_at is not None:
+        timestamp = Timestamp()
+        timestamp.FromDatetime(expires_at)
+        response.token_info.expires_at.CopyFrom(timestamp)
+    return response
+
+
+NOT_FOUND_RESPONSE = token_database_pb2.GetTokenInfoResponse(
+    status=token_database_pb2.DatabaseOperationStatus.DATABASE_OPERATION_STATUS_NOT_FOUND,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_token_info_cache() -> Iterator[None]:
+    """Start and end each test with no cached token info or lookup in flight."""
+    token_info_module._token_info_cache.clear()  # noqa: SLF001
+    token_info_module._inflight_lookups.clear()  # noqa: SLF001
+    yield
+    token_info_module._token_info_cache.clear()  # noqa: SLF001
+    token_info_module._inflight_lookups.clear()  # noqa: SLF001
+
+
+@pytest.fixture
+def stub(mocker: MockerFixture) -> MagicMock:
+    """Replace the stub to the token database."""
+    stub = MagicMock()
+    mocker.patch("get_token_info._get_token_database_stub", return_value=stub)
+    return stub
+
+
+def wait_until(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """Wait until the condition holds.
+
+    Args:
+        condition (Callable[[], bool]): condition to wait for
+        timeout (float): maximum seconds to wait
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_get_token_info_uses_cache(stub: MagicMock) -> None:
+    """Test that a token found in the token database is served from the cache."""
+    stub.GetTokenInfo.return_value = construct_found_response()
+
+    token_info = get_token_info(ADDRESS_TOKEN_DB, TOKEN)
+    assert token_info == TokenInfo(role="admin", name="user1", expires_at=None)
+    assert get_token_info(ADDRESS_TOKEN_DB, TOKEN) is token_info
+    assert stub.GetTokenInfo.call_count == 1
+
+    # Tokens are cached per address of the token database.
+    get_token_info("another_token_database:8084", TOKEN)
+    assert stub.GetTokenInfo.call_count == 2
+
+
+def test_get_token_info_caches_not_found(stub: MagicMock) -> None:
+    """Test that a token not found in the token database is cached."""
+    stub.GetTokenInfo.return_value = NOT_FOUND_RESPONSE
+
+    assert get_token_info(ADDRESS_TOKEN_DB, TOKEN) is None
+    assert get_token_info(ADDRESS_TOKEN_DB, TOKEN) is None
+    assert stub.GetTokenInfo.call_count == 1
+
+    _, cached_until, _ = token_info_module._token_info_cache[ADDRESS_TOKEN_DB, TOKEN]  # noqa: SLF001
+    assert cached_until - time.monotonic() <= token_info_module.TOKEN_INFO_NEGATIVE_CACHE_TTL_SECONDS
+
+
+def test_get_token_info_does_not_cache_beyond_expiry(stub: MagicMock) -> None:
+    """Test that a token is not cached beyond its expiry."""
+    expires_in = 2.0
+    stub.GetTokenInfo.return_value = construct_found_response(
+        expires_at=datetime.now().astimezone() + timedelta(seconds=expires_in)
+    )
+
+    get_token_info(ADDRESS_TOKEN_DB, TOKEN)
+    refresh_at, cached_until, _ = token_info_module._token_info_cache[ADDRESS_TOKEN_DB, TOKEN]  # noqa: SLF001
+    assert expires_in < token_info_module.TOKEN_INFO_CACHE_TTL_SECONDS
+    assert cached_until - time.monotonic() <= expires_in
+    assert refresh_at < cached_until
+
+    # An expired token is not cached at all.
+    token_info_module._token_info_cache.clear()  # noqa: SLF001
+    stub.GetTokenInfo.return_value = construct_found_response(
+        expires_at=datetime.now().astimezone() - timedelta(seconds=1)
+    )
+    get_token_info(ADDRESS_TOKEN_DB, TOKEN)
+    get_token_info(ADDRESS_TOKEN_DB, TOKEN)
+    assert stub.GetTokenInfo.call_count == 3
+
+
+def test_get_token_info_evicts_oldest_entry(stub: MagicMock, mocker: MockerFixture) -> None:
+    """Test that the oldest entry is evicted when the cache is full."""
+    mocker.patch("get_token_info.TOKEN_INFO_CACHE_MAX_ENTRIES", 2)
+    stub.GetTokenInfo.return_value = construct_found_response()
+
+    for token in ("token1", "token2", "token3"):
+        get_token_info(ADDRESS_TOKEN_DB, token)
+
+    assert list(token_info_module._token_info_cache) == [  # noqa: SLF001
+        (ADDRESS_TOKEN_DB, "token2"),
+        (ADDRESS_TOKEN_DB, "token3"),
+    ]
+
+
+def run_concurrently(fn: Callable[[], object]) -> list[object]:
+    """Call a function from concurrent threads.
+
+    Args:
+        fn (Callable[[], object]): function to call
+
+    Returns:
+        list[object]: return value or raised exception of each call
+    """
+    results: list[object] = [None] * N_CONCURRENT_CALLERS
+
+    def call(i: int) -> None:
+        try:
+            results[i] = fn()
+        except Exception as e:  # noqa: BLE001
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(N_CONCURRENT_CALLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_get_token_info_shares_concurrent_lookups(stub: MagicMock) -> None:
+    """Test that concurrent lookups of the same token send a single request."""
+    release = threading.Event()
+
+    def get_token_info_rpc(*_args: object, **_kwargs: object) -> token_database_pb2.GetTokenInfoResponse:
+        release.wait()
+        return construct_found_response()
+
+    stub.GetTokenInfo.side_effect = get_token_info_rpc
+    # Let the callers join the lookup in flight before it completes.
+    threading.Timer(0.2, release.set).start()
+    results = run_concurrently(lambda: get_token_info(ADDRESS_TOKEN_DB, TOKEN))
+
+    assert stub.GetTokenInfo.call_count == 1
+    assert all(result == TokenInfo(role="admin", name="user1", expires_at=None) for result in results)
+    assert not token_info_module._inflight_lookups  # noqa: SLF001
+
+
+def test_get_token_info_propagates_error_to_waiting_callers(stub: MagicMock) -> None:
+    """Test that an error of a shared lookup is raised to every caller waiting for it."""
+    release = threading.Event()
+
+    def get_token_info_rpc(*_args: object, **_kwargs: object) -> token_database_pb2.GetTokenInfoResponse:
+        release.wait()
+        msg = "token database is unavailable"
+        raise RuntimeError(msg)
+
+    stub.GetTokenInfo.side_effect = get_token_info_rpc
+    threading.Timer(0.2, release.set).start()
+    results = run_concurrently(lambda: get_token_info(ADDRESS_TOKEN_DB, TOKEN))
+
+    assert stub.GetTokenInfo.call_count == 1
+    assert all(isinstance(result, TokenDatabaseError) for result in results)
+    assert not token_info_module._inflight_lookups  # noqa: SLF001
+    assert (ADDRESS_TOKEN_DB, TOKEN) not in token_info_module._token_info_cache  # noqa: SLF001
+
+
+def test_get_token_info_refreshes_entry_in_background(stub: MagicMock) -> None:
+    """Test that an entry past half of its TTL is returned and replaced in the background."""
+    old_token_info = TokenInfo(role="guest", name="user1", expires_at=None)
+    now = time.monotonic()
+    token_info_module._token_info_cache[ADDRESS_TOKEN_DB, TOKEN] = (now - 1, now + 60, old_token_info)  # noqa: SLF001
+    stub.GetTokenInfo.return_value = construct_found_response(role="admin")
+
+    assert get_token_info(ADDRESS_TOKEN_DB, TOKEN) is old_token_info
+    cache = token_info_module._token_info_cache  # noqa: SLF001
+    wait_until(lambda: cache[ADDRESS_TOKEN_DB, TOKEN][2] != old_token_info)
+
+    assert get_token_info(ADDRESS_TOKEN_DB, TOKEN) == TokenInfo(role="admin", name="user1", expires_at=None)
+    assert stub.GetTokenInfo.call_count == 1
+
+
+def test_get_token_info_postpones_refresh_after_failure(stub: MagicMock) -> None:
+    """Test that an entry whose refresh fails is returned without starting another refresh on every hit."""
+    old_token_info = TokenInfo(role="guest", name="user1", expires_at=None)
+    now = time.monotonic()
+    token_info_module._token_info_cache[ADDRESS_TOKEN_DB, TOKEN] = (now - 1, now + 60, old_token_info)  # noqa: SLF001
+    stub.GetTokenInfo.side_effect = RuntimeError("token database is unavailable")
+
+    assert get_token_info(ADDRESS_TOKEN_DB, TOKEN) is old_token_info
+    wait_until(lambda: stub.GetTokenInfo.call_count == 1 and not token_info_module._inflight_lookups)  # noqa: SLF001
+
+    for _ in range(N_CONCURRENT_CALLERS):
+        assert get_token_info(ADDRESS_TOKEN_DB, TOKEN) is old_token_info
+    assert stub.GetTokenInfo.call_count == 1
+
+    refresh_at, cached_until, _ = token_info_module._token_info_cache[ADDRESS_TOKEN_DB, TOKEN]  # noqa: SLF001
+    assert time.monotonic() < refresh_at <= time.monotonic() + token_info_module.TOKEN_INFO_REFRESH_BACKOFF_SECONDS
+    assert cached_until == now + 60
+
+
+def test_refresh_executor_is_created_on_first_use(mocker: MockerFixture) -> None:
+    """Test that the executor of background refreshes is created on the first refresh only."""
+    mocker.patch("get_token_info._refresh_executor", None)
+
+    executor = token_info_module._get_refresh_executor()  # noqa: SLF001
+    try:
+        assert token_info_module._refresh_executor is executor  # noqa: SLF001
+        assert token_info_module._get_refresh_executor() is executor  # noqa: SLF001
+    finally:
+        executor.shutdown()
+
+
+def test_refresh_after_shutdown_does_not_report_not_found(mocker: MockerFixture) -> None:
+    """Test that callers waiting for a refresh that cannot start get an error instead of a token not found."""
+    mocker.patch("get_token_info._refresh_executor_closed", True)
+
+    future, is_owner = token_info_module._start_lookup((ADDRESS_TOKEN_DB, TOKEN), background=True)  # noqa: SLF001
+
+    assert not is_owner
+    assert isinstance(future.exception(timeout=0), TokenDatabaseError)
+    assert not token_info_module._inflight_lookups  # noqa: SLF001
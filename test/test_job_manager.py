@@ -1,8 +1,11 @@
 """Tests for the job manager."""
 
 import sys
+import threading
+import time
 from datetime import timedelta
 from pathlib import Path
+from typing import Any
 
 import pytest
 
@@ -15,7 +18,7 @@ from common import SAMPLE_AWS_CREDENTIALS, construct_sample_program, construct_s
 from get_token_info import TokenInfo
 from google.protobuf import timestamp_pb2
 from job_manager import dynamodb_helper
-from job_manager.job_manager import JobManager
+from job_manager.job_manager import MARK_RUNNING_MAX_ATTEMPTS, JobManager
 from job_manager.job_metadata import JOB_EXPIRY_DAYS, JobStatus
 from job_manager.job_queue import JobQueue
 from job_manager.job_repository import JobRepository
@@ -58,6 +61,7 @@ def test_job_manager_constructor(request: pytest.FixtureRequest) -> None:
     assert job_manager.job_repository == job_repository
     assert job_manager.table_name == dynamodb_table_name
     assert job_manager.dynamodb_client.meta.config.retries["total_max_attempts"] == dynamodb_max_attempts
+    assert job_manager.dynamodb_client.meta.config.max_pool_connections == 64
     assert job_manager.dynamodb_client.meta.config.retries["mode"] == "standard"
 
     for backend in backends:
@@ -149,6 +153,33 @@ def test_job_manager_restore_job_queue(request: pytest.FixtureRequest) -> None:
     assert job_manager.job_queue["emulator"].try_pop() is None
 
 
+@mock_aws
+def test_job_manager_restore_job_queue_skips_download_into_full_queue(
+    request: pytest.FixtureRequest, mocker: MockerFixture
+) -> None:
+    # Create a bucket to save job inputs
+    s3_client = boto3.client("s3", region_name=SAMPLE_AWS_CREDENTIALS.region_name)
+    s3_client.create_bucket(Bucket=request.node.name)
+
+    job_manager = construct_sample_job_manager(request=request, backends={"qpu", "emulator"})
+    job_metadata = job_manager.add_job_request(
+        job_request=construct_sample_job_request(), token_info=TokenInfo(name="user1", role="guest", expires_at=None)
+    )
+    assert job_metadata.status == JobStatus.QUEUED
+
+    # Reconstruct a job manager whose queue cannot hold any job
+    download_job_input = mocker.spy(JobRepository, "download_job_input")
+    job_manager = construct_sample_job_manager(
+        request=request, backends={"qpu", "emulator"}, queue_capacity_bytes=0, create_table=False
+    )
+    download_job_input.assert_not_called()
+    assert job_manager.job_queue["emulator"].try_pop() is None
+
+    db_metadata = job_manager.get_job_metadata(job_id=job_metadata.job_id)
+    assert db_metadata.status == JobStatus.FAILED
+    assert db_metadata.status_code == "RESOURCE_EXHAUSTED"
+
+
 @mock_aws
 def test_job_manager_fail_running_job(request: pytest.FixtureRequest) -> None:
     # Create a bucket to save job inputs
@@ -215,18 +246,25 @@ def test_job_manager_add_job_request(request: pytest.FixtureRequest) -> None:
 
 
 @mock_aws
-def test_job_manager_add_job_request_fails_on_full_queue(request: pytest.FixtureRequest) -> None:
+def test_job_manager_add_job_request_fails_on_full_queue(
+    request: pytest.FixtureRequest, mocker: MockerFixture
+) -> None:
     job_manager = construct_sample_job_manager(request=request, backends={"qpu", "emulator"}, queue_capacity_bytes=0)
     job_request = construct_sample_job_request()
+    upload_job_input = mocker.spy(JobRepository, "upload_job_input")
     initial_metadata = job_manager.add_job_request(
         job_request=job_request, token_info=TokenInfo(name="user1", role="guest", expires_at=None)
     )
+    error_message = "The job was not accepted due to current resource limits. Please try again later."
     assert initial_metadata.status == JobStatus.FAILED
     assert initial_metadata.status_code == "RESOURCE_EXHAUSTED"
-    assert (
-        initial_metadata.status_message
-        == "The job was not accepted due to current resource limits. Please try again later."
-    )
+    assert initial_metadata.status_message == error_message
+
+    # A rejected job is recorded as failed without uploading its input.
+    upload_job_input.assert_not_called()
+    db_metadata = job_manager.get_job_metadata(initial_metadata.job_id)
+    assert db_metadata.status == JobStatus.FAILED
+    assert db_metadata.status_message == error_message
 
 
 @mock_aws
@@ -278,6 +316,7 @@ def test_job_manager_add_job_request_fails_on_upload_input(
     assert db_metadata.status == JobStatus.FAILED
     assert db_metadata.status_code == error_code
     assert db_metadata.status_message == error_message
+    assert job_manager.job_queue["emulator"].try_pop() is None
 
 
 @mock_aws
@@ -468,6 +507,23 @@ def test_job_manager_fetch_next_job(request: pytest.FixtureRequest) -> None:
     assert start_time < convert_timestamp_to_datetime(job_metadata.dequeued_at) < end_time
 
 
+@mock_aws
+def test_job_manager_fetch_next_job_from_empty_queue_skips_io(
+    request: pytest.FixtureRequest, mocker: MockerFixture
+) -> None:
+    job_manager = construct_sample_job_manager(request=request, backends={"qpu", "emulator"})
+
+    get_item = mocker.spy(dynamodb_helper, "get_item")
+    update_item = mocker.spy(dynamodb_helper, "update_item")
+    generate_upload_url = mocker.spy(JobRepository, "generate_upload_url")
+
+    next_job = job_manager.fetch_next_job_to_execute(execution_pb2.AssignNextJobRequest(backend="emulator"))
+    assert next_job == execution_pb2.AssignNextJobResponse()
+    get_item.assert_not_called()
+    update_item.assert_not_called()
+    generate_upload_url.assert_not_called()
+
+
 @mock_aws
 def test_job_manager_fetch_next_job_fails_on_unsupported_backend(request: pytest.FixtureRequest) -> None:
     job_manager = construct_sample_job_manager(request=request, backends={"qpu", "emulator"})
@@ -568,7 +624,7 @@ def test_job_manager_fetch_next_job_fails_on_generate_upload_url(
 
 
 @mock_aws
-def test_job_manager_fetch_next_job_fails_on_update_status(
+def test_job_manager_fetch_next_job_succeeds_when_update_status_fails(
     request: pytest.FixtureRequest, mocker: MockerFixture
 ) -> None:
     job_manager = construct_sample_job_manager(request=request, backends={"qpu", "emulator"})
@@ -578,24 +634,159 @@ def test_job_manager_fetch_next_job_fails_on_update_status(
         job_request=job_request, token_info=TokenInfo(name="user1", role="guest", expires_at=None)
     )
 
+    mocker.patch("job_manager.job_manager.MARK_RUNNING_INITIAL_BACKOFF_SECONDS", 0)
     error = ClientError(error_response={"Error": {"Code": "404"}}, operation_name="update_item")
-    error_message = "An internal error occurred. Please try again later."
-    mocker.patch.object(
+    update_item = mocker.patch.object(
         dynamodb_helper,
         "update_item",
         side_effect=error,
     )
-    # Failed to update the job status on DB
+    # The job is assigned even if the status update in the background fails
     next_job = job_manager.fetch_next_job_to_execute(execution_pb2.AssignNextJobRequest(backend="emulator"))
-    assert next_job.error.code == "INTERNAL"
-    assert next_job.error.description == error_message
+    assert next_job.job_id == initial_metadata.job_id
+    assert not next_job.error.code
 
     db_metadata = job_manager.get_job_metadata(initial_metadata.job_id)
+    # The update to RUNNING is retried, then the update to FAILED is attempted once
+    assert update_item.call_count == MARK_RUNNING_MAX_ATTEMPTS + 1
     assert db_metadata.status == JobStatus.QUEUED
     assert not db_metadata.status_code
     assert not db_metadata.status_message
 
 
+@mock_aws
+def test_job_manager_fetch_next_job_retries_update_status(
+    request: pytest.FixtureRequest, mocker: MockerFixture
+) -> None:
+    job_manager = construct_sample_job_manager(request=request, backends={"qpu", "emulator"})
+    job_request = construct_sample_job_request()
+
+    initial_metadata = job_manager.add_job_request(
+        job_request=job_request, token_info=TokenInfo(name="user1", role="guest", expires_at=None)
+    )
+
+    mocker.patch("job_manager.job_manager.MARK_RUNNING_INITIAL_BACKOFF_SECONDS", 0)
+    original_update_item = dynamodb_helper.update_item
+    error = ClientError(error_response={"Error": {"Code": "500"}}, operation_name="update_item")
+
+    def fail_first_update(**kwargs: Any) -> None:  # noqa: ANN401
+        if update_item.call_count == 1:
+            raise error
+        original_update_item(**kwargs)
+
+    update_item = mocker.patch.object(dynamodb_helper, "update_item", side_effect=fail_first_update)
+    # The first update to RUNNING fails and the retry succeeds
+    next_job = job_manager.fetch_next_job_to_execute(execution_pb2.AssignNextJobRequest(backend="emulator"))
+    assert next_job.job_id == initial_metadata.job_id
+
+    db_metadata = job_manager.get_job_metadata(initial_metadata.job_id)
+    assert update_item.call_count == 2
+    assert db_metadata.status == JobStatus.RUNNING
+    assert db_metadata.dequeued_at is not None
+
+
+@mock_aws
+def test_job_manager_fetch_next_job_marks_job_as_failed_when_update_status_fails(
+    request: pytest.FixtureRequest, mocker: MockerFixture
+) -> None:
+    job_manager = construct_sample_job_manager(request=request, backends={"qpu", "emulator"})
+    job_request = construct_sample_job_request()
+
+    initial_metadata = job_manager.add_job_request(
+        job_request=job_request, token_info=TokenInfo(name="user1", role="guest", expires_at=None)
+    )
+
+    mocker.patch("job_manager.job_manager.MARK_RUNNING_INITIAL_BACKOFF_SECONDS", 0)
+    original_update_item = dynamodb_helper.update_item
+    error = ClientError(error_response={"Error": {"Code": "500"}}, operation_name="update_item")
+
+    def fail_update_to_running(**kwargs: Any) -> None:  # noqa: ANN401
+        if kwargs["update_values"]["status"] == JobStatus.RUNNING:
+            raise error
+        original_update_item(**kwargs)
+
+    mocker.patch.object(dynamodb_helper, "update_item", side_effect=fail_update_to_running)
+    # All attempts to update the job status to RUNNING fail
+    next_job = job_manager.fetch_next_job_to_execute(execution_pb2.AssignNextJobRequest(backend="emulator"))
+    assert next_job.job_id == initial_metadata.job_id
+
+    # The job is marked as FAILED so that it is not restored to the queue after a restart
+    db_metadata = job_manager.get_job_metadata(initial_metadata.job_id)
+    assert db_metadata.status == JobStatus.FAILED
+    assert db_metadata.status_code == "INTERNAL"
+    assert db_metadata.dequeued_at is not None
+
+
+@mock_aws
+def test_job_manager_fetch_next_job_is_not_blocked_by_status_writes(
+    request: pytest.FixtureRequest, mocker: MockerFixture
+) -> None:
+    job_manager = construct_sample_job_manager(
+        request=request, backends={"qpu", "emulator"}, queue_capacity_bytes=100_000
+    )
+    token_info = TokenInfo(name="user1", role="guest", expires_at=None)
+    # More jobs than the workers of the executor generating the upload URLs
+    job_ids = [
+        job_manager.add_job_request(job_request=construct_sample_job_request(), token_info=token_info).job_id
+        for _ in range(5)
+    ]
+
+    release = threading.Event()
+    original_update_item = dynamodb_helper.update_item
+
+    def wait_for_release(**kwargs: Any) -> None:  # noqa: ANN401
+        release.wait(timeout=10)
+        original_update_item(**kwargs)
+
+    mocker.patch.object(dynamodb_helper, "update_item", side_effect=wait_for_release)
+    # The jobs are assigned while the updates of the previous jobs to RUNNING are still pending
+    start = time.monotonic()
+    assigned_job_ids = {
+        job_manager.fetch_next_job_to_execute(execution_pb2.AssignNextJobRequest(backend="emulator")).job_id
+        for _ in job_ids
+    }
+    assert time.monotonic() - start < 5
+    assert assigned_job_ids == set(job_ids)
+    release.set()
+
+    for job_id in job_ids:
+        assert job_manager.get_job_metadata(job_id).status == JobStatus.RUNNING
+
+
+@mock_aws
+def test_job_manager_fetch_next_job_keeps_status_changed_before_update(
+    request: pytest.FixtureRequest, mocker: MockerFixture
+) -> None:
+    job_manager = construct_sample_job_manager(request=request, backends={"qpu", "emulator"})
+    job_request = construct_sample_job_request()
+
+    initial_metadata = job_manager.add_job_request(
+        job_request=job_request, token_info=TokenInfo(name="user1", role="guest", expires_at=None)
+    )
+    job_id = initial_metadata.job_id
+
+    original_update_item = dynamodb_helper.update_item
+
+    def cancel_before_update(**kwargs: Any) -> None:  # noqa: ANN401
+        # The job is cancelled just before its status is updated to RUNNING
+        original_update_item(
+            dynamodb_client=kwargs["dynamodb_client"],
+            table_name=kwargs["table_name"],
+            job_id=kwargs["job_id"],
+            update_values={"status": JobStatus.CANCELLED},
+        )
+        original_update_item(**kwargs)
+
+    update_item = mocker.patch.object(dynamodb_helper, "update_item", side_effect=cancel_before_update)
+    next_job = job_manager.fetch_next_job_to_execute(execution_pb2.AssignNextJobRequest(backend="emulator"))
+    assert next_job.job_id == job_id
+
+    # The conditional update neither overwrites the status nor is retried
+    db_metadata = job_manager.get_job_metadata(job_id)
+    assert update_item.call_count == 1
+    assert db_metadata.status == JobStatus.CANCELLED
+
+
 @mock_aws
 @pytest.mark.parametrize(
     ("execution_status", "execution_status_message", "expected_job_status", "upload_result"),
@@ -708,7 +899,33 @@ def test_job_manager_finalize_job(  # noqa: PLR0914
 
 
 @mock_aws
-def test_job_manager_finalize_job_fails_on_check_item_exists(  # noqa: PLR0914
+def test_job_manager_finalize_job_reuses_metadata_of_assigned_job(
+    request: pytest.FixtureRequest, mocker: MockerFixture
+) -> None:
+    job_manager = construct_sample_job_manager(request=request, backends={"qpu", "emulator"})
+    job_request = construct_sample_job_request()
+
+    job_id = job_manager.add_job_request(
+        job_request=job_request, token_info=TokenInfo(name="user1", role="guest", expires_at=None)
+    ).job_id
+    next_job = job_manager.fetch_next_job_to_execute(execution_pb2.AssignNextJobRequest(backend="emulator"))
+    assert next_job.job_id == job_id
+
+    put_tags_to_result = mocker.patch.object(JobRepository, "put_tags_to_result")
+    get_item = mocker.spy(dynamodb_helper, "get_item")
+    response = job_manager.finalize_job(
+        execution_result=execution_pb2.ReportExecutionResultRequest(
+            job_id=job_id, status=execution_pb2.EXECUTION_STATUS_SUCCESS
+        )
+    )
+    assert response == execution_pb2.ReportExecutionResultResponse()
+    put_tags_to_result.assert_called_once_with(job_id=job_id, token_role="guest", save_job=False)
+    get_item.assert_not_called()
+    assert job_manager.get_job_metadata(job_id=job_id).status == JobStatus.COMPLETED
+
+
+@mock_aws
+def test_job_manager_finalize_job_fails_on_get_item(  # noqa: PLR0914
     request: pytest.FixtureRequest, mocker: MockerFixture
 ) -> None:
     s3_client = boto3.client("s3", region_name=SAMPLE_AWS_CREDENTIALS.region_name)
@@ -755,10 +972,10 @@ def test_job_manager_finalize_job_fails_on_check_item_exists(  # noqa: PLR0914
         ),
     )
 
-    error = ClientError(error_response={"Error": {"Code": "404"}}, operation_name="check_item_exists")
+    error = ClientError(error_response={"Error": {"Code": "404"}}, operation_name="get_item")
     mocker.patch.object(
         dynamodb_helper,
-        "check_item_exists",
+        "get_item",
         side_effect=error,
     )
     response = job_manager.finalize_job(execution_result=execution_result)
@@ -67,6 +67,20 @@ def test_burst_score_update():
     assert updated_burst_score == 1.75  # (1.5 * 0.5) + 1 = 1.75
 
 
+def test_burst_score_manager_prune():
+    burst_score_manager = BurstScoreManager(burst_score_half_life=timedelta(minutes=1))
+    current_time = get_current_datetime()
+
+    an_hour_ago = current_time - timedelta(hours=1)
+    burst_score_manager.update_burst_score(token="idle_token", current_time=an_hour_ago)  # noqa: S106
+    burst_score_manager.update_burst_score(token="queued_token", current_time=an_hour_ago)  # noqa: S106
+    burst_score_manager.update_burst_score(token="active_token", current_time=current_time)  # noqa: S106
+
+    assert burst_score_manager.prune(current_time=current_time, tokens_to_keep={"queued_token"}) == 1
+    assert set(burst_score_manager.token_burst_scores) == {"queued_token", "active_token"}
+    assert burst_score_manager.get_burst_score(token="idle_token") == 1.0  # noqa: S106
+
+
 @pytest.mark.parametrize(
     ("role", "expected"),
     [
@@ -114,10 +128,7 @@ def test_calc_timeout_factor(timeout_seconds: float, max_timeout_seconds: float,
     ],
 )
 def test_calc_age_factor(waiting_seconds: float, max_age_seconds: float, expected: float):
-    queued_at = get_current_datetime()
-    current_time = queued_at + timedelta(seconds=waiting_seconds)
-    max_age = timedelta(seconds=max_age_seconds)
-    assert calc_age_factor(current_time=current_time, queued_at=queued_at, max_age=max_age) == expected
+    assert calc_age_factor(waiting_seconds=waiting_seconds, max_age_seconds=max_age_seconds) == expected
 
 
 @pytest.mark.parametrize(
@@ -151,7 +162,7 @@ def test_job_priority_constructor():
     priority = job_priority_factory.create(token=token, role=role, queued_at=queued_at, timeout=timedelta(minutes=3))
 
     assert priority._token == token  # noqa: SLF001
-    assert priority._queued_at == queued_at  # noqa: SLF001
+    assert priority._queued_at_ts == queued_at.timestamp()  # noqa: SLF001
     assert priority.factor_weights == factor_weights
     assert (
         priority._base_priority == 1700  # noqa: SLF001
@@ -193,8 +204,8 @@ def test_job_priority_calc_priority(
         age_factor=w_age_factor,
         fair_share_factor=w_fair_share_factor,
     )
-    max_age = timedelta(minutes=60)
-    current_time = queued_at + timedelta(minutes=15)  # wait 15 minutes
+    max_age_seconds = timedelta(minutes=60).total_seconds()
+    current_ts = queued_at.timestamp() + timedelta(minutes=15).total_seconds()  # wait 15 minutes
     burst_penalty = 2.0
 
     job_priority_factory = JobPriorityFactory(
@@ -210,13 +221,13 @@ def test_job_priority_calc_priority(
         timeout=timedelta(minutes=timeout_minutes), role_max_timeout=get_role_max_timeout(role=role)
     )
     age_priority = factor_weights.age_factor * calc_age_factor(
-        queued_at=queued_at, current_time=current_time, max_age=max_age
+        waiting_seconds=current_ts - queued_at.timestamp(), max_age_seconds=max_age_seconds
     )
     fair_share_priority = factor_weights.fair_share_factor * calc_fair_share_factor(
         burst_score=1, burst_penalty=burst_penalty
     )
 
     assert (
-        priority.calc_priority(current_time=current_time, max_age=max_age)
+        priority.calc_priority(current_ts=current_ts, max_age_seconds=max_age_seconds)
         == role_priority + timeout_priority + age_priority + fair_share_priority
     )
@@ -4,6 +4,7 @@ import sys
 from pathlib import Path
 
 import pytest
+from pytest_mock import MockerFixture
 
 sys.path.append(Path(__file__).parents[1].as_posix())
 
@@ -351,3 +352,26 @@ def test_job_queue_container_unify() -> None:
     assert "backend1" in job_queues
     assert "backend2" in job_queues
     assert "backend3" in job_queues
+
+
+def test_job_queue_container_keeps_burst_scores_of_tokens_queued_on_other_backends(mocker: MockerFixture) -> None:
+    mocker.patch("job_manager.job_queue.BURST_SCORE_PRUNE_INTERVAL", 1)
+    job_queues = JobQueueContainer(["backend1", "backend2"], capacity_bytes=1_000_000_000)
+    # The burst score manager shared by all queues is replaced when a queue is created.
+    burst_scores = JobPriority.burst_score_manager.token_burst_scores
+    program = construct_sample_program()
+    # Burst scores updated a day ago have decayed away.
+    queued_at = get_current_datetime() - timedelta(days=1)
+    for job_id, token, backend in [
+        ("job1", "token1", "backend1"),
+        ("job2", "token2", "backend2"),
+        ("job3", "token3", "backend2"),
+    ]:
+        assert job_queues[backend].try_push(
+            job_id=job_id, program=program, token=token, role="guest", queued_at=queued_at, timeout=timedelta(seconds=1)
+        )
+    assert job_queues["backend2"].try_remove("job3")
+
+    # The pop from `backend1` keeps the burst score of the token with a job in `backend2`.
+    assert job_queues["backend1"].try_pop() == ("job1", program)
+    assert set(burst_scores) == {"token2"}
@@ -1,10 +1,12 @@
 """Tests for JobRepository."""
 
+import gzip
 import sys
 from pathlib import Path
 
 import boto3
 import pytest
+from botocore.exceptions import ClientError
 from moto import mock_aws
 from pytest_mock import MockerFixture
 
@@ -14,7 +16,12 @@ sys.path.append(Path(__file__).parents[1].as_posix())
 from common import SAMPLE_AWS_CREDENTIALS, construct_sample_program, construct_sample_settings
 from google.protobuf.timestamp_pb2 import Timestamp
 from job_manager.job_metadata import JobMetadata
-from job_manager.job_repository import DOWNLOAD_URL_EXPIRATION_TIME, UPLOAD_URL_EXPIRATION_TIME, JobRepository
+from job_manager.job_repository import (
+    DOWNLOAD_URL_EXPIRATION_TIME,
+    DOWNLOAD_URL_REUSE_MIN_REMAINING_SECONDS,
+    UPLOAD_URL_EXPIRATION_TIME,
+    JobRepository,
+)
 
 
 def create_bucket(bucket: str) -> None:
@@ -36,20 +43,54 @@ def test_job_repository_constructor() -> None:
     create_bucket(bucket)
 
     s3_max_attempts = 10
+    s3_max_pool_connections = 20
     job_repository = JobRepository(
         bucket_name=bucket,
         aws_credentials=SAMPLE_AWS_CREDENTIALS,
         s3_max_attempts=s3_max_attempts,
+        s3_max_pool_connections=s3_max_pool_connections,
     )
     assert job_repository.bucket_name == bucket
     assert job_repository.s3.meta.config.retries["total_max_attempts"] == s3_max_attempts
     assert job_repository.s3.meta.config.retries["mode"] == "standard"
+    assert job_repository.s3.meta.config.max_pool_connections == s3_max_pool_connections
+    assert job_repository.s3.meta.config.tcp_keepalive
+    assert not job_repository.s3.meta.config.s3["use_accelerate_endpoint"]
+
+    job_repository = JobRepository(
+        bucket_name=bucket,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+        use_transfer_acceleration=True,
+    )
+    assert job_repository.s3.meta.config.s3["use_accelerate_endpoint"]
+
+
+@mock_aws
+def test_bucket_exists(mocker: MockerFixture) -> None:
+    """Test checking if the S3 bucket exists."""
+    bucket = "test_bucket"
+    create_bucket(bucket)
+    job_repository = JobRepository(
+        bucket_name=bucket,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+    )
+    spy = mocker.spy(job_repository.s3, "head_bucket")
+
+    assert job_repository.bucket_exists()
+    assert job_repository.bucket_exists()
+    assert spy.call_count == 1
+
+    job_repository = JobRepository(
+        bucket_name="missing_bucket",
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+    )
+    assert not job_repository.bucket_exists()
 
 
 @mock_aws
 def test_generate_upload_url(mocker: MockerFixture) -> None:
     """Test generating a presigned URL for uploading the result of a job to S3."""
-    mocker.patch.object(Timestamp, "GetCurrentTime", return_value=Timestamp(seconds=0))
+    mocker.patch("job_manager.job_repository.time.time", return_value=0.0)
     bucket = "test_bucket"
     job_id = "test_job_id"
     create_bucket(bucket)
@@ -83,7 +124,7 @@ def test_generate_upload_url(mocker: MockerFixture) -> None:
 @mock_aws
 def test_generate_download_url(mocker: MockerFixture) -> None:
     """Test generating a presigned URL for downloading the result of a job to S3."""
-    mocker.patch.object(Timestamp, "GetCurrentTime", return_value=Timestamp(seconds=0))
+    mocker.patch("job_manager.job_repository.time.time", return_value=0.0)
     bucket = "test_bucket"
     job_id = "test_job_id"
     create_bucket(bucket)
@@ -114,6 +155,27 @@ def test_generate_download_url(mocker: MockerFixture) -> None:
     assert expires_at == mocked_expected_expires_at
 
 
+@mock_aws
+def test_generate_download_url_reuses_url(mocker: MockerFixture) -> None:
+    """Test that a presigned URL for downloading is reused while it is valid long enough."""
+    bucket = "test_bucket"
+    job_id = "test_job_id"
+    create_bucket(bucket)
+    job_repository = JobRepository(
+        bucket_name=bucket,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+    )
+    spy = mocker.spy(job_repository.s3, "generate_presigned_url")
+
+    assert job_repository.generate_download_url(job_id) == job_repository.generate_download_url(job_id)
+    assert spy.call_count == 1
+
+    # A URL that would expire soon is not reused.
+    job_repository.generate_download_url(job_id, DOWNLOAD_URL_REUSE_MIN_REMAINING_SECONDS - 1)
+    job_repository.generate_download_url(job_id, DOWNLOAD_URL_REUSE_MIN_REMAINING_SECONDS - 1)
+    assert spy.call_count == 3
+
+
 @pytest.mark.parametrize(
     ("token_role", "save_job"),
     [
@@ -172,19 +234,90 @@ def test_upload_job_input() -> None:
         aws_credentials=SAMPLE_AWS_CREDENTIALS,
     )
 
-    job_repository.upload_job_input(program=compiled_circuit, job_metadata=job_metadata)
+    assert job_repository.upload_job_input(program=compiled_circuit, job_metadata=job_metadata) == len(
+        compiled_circuit.SerializeToString()
+    )
     client = boto3.client("s3", region_name=SAMPLE_AWS_CREDENTIALS.region_name)
     actual_tag = client.get_object_tagging(Bucket=bucket, Key=f"{job_id}.in.proto")["TagSet"]
     actual_tag_dict = {tag["Key"]: tag["Value"] for tag in actual_tag}
 
-    # Check if the object was uploaded with correct key.
-    client.get_object(Bucket=bucket, Key=f"{job_id}.in.proto")
+    # Check if the small object was uploaded with correct key and without compression.
+    response = client.get_object(Bucket=bucket, Key=f"{job_id}.in.proto")
+    assert response["Body"].read() == compiled_circuit.SerializeToString()
+    assert "ContentEncoding" not in response
 
     assert actual_tag_dict["token_role"] == job_metadata.role
     assert actual_tag_dict["save_job"] == str(job_metadata.save_job).lower()
     assert actual_tag_dict["upload-status"] == "complete"
 
 
+@mock_aws
+def test_upload_large_job_input(mocker: MockerFixture) -> None:
+    """Test uploading job input at least as large as the compression threshold to S3."""
+    mocker.patch("job_manager.job_repository.JOB_INPUT_COMPRESSION_MIN_BYTES", 0)
+    bucket = "test_bucket"
+    create_bucket(bucket)
+
+    job_id = "job_1"
+    compiled_circuit = construct_sample_program()
+    settings = construct_sample_settings()
+    job_metadata = JobMetadata(
+        job_id=job_id,
+        max_elapsed_s=10,
+        sdk_version="0.0.0",
+        token="token1",  # noqa: S106
+        role="admin",
+        requested_backend=settings.backend,
+        n_shots=settings.n_shots,
+        save_job=True,
+    )
+
+    job_repository = JobRepository(
+        bucket_name=bucket,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+    )
+    job_repository.upload_job_input(program=compiled_circuit, job_metadata=job_metadata)
+
+    # Check if the object was uploaded with correct key and compressed.
+    client = boto3.client("s3", region_name=SAMPLE_AWS_CREDENTIALS.region_name)
+    response = client.get_object(Bucket=bucket, Key=f"{job_id}.in.proto.gz")
+    assert gzip.decompress(response["Body"].read()) == compiled_circuit.SerializeToString()
+    assert response["ContentEncoding"] == "gzip"
+    assert job_repository.download_job_input(job_id=job_id) == compiled_circuit
+
+
+@mock_aws
+def test_upload_job_input_fails(mocker: MockerFixture) -> None:
+    """Test that a failure to upload job input to S3 is raised."""
+    bucket = "test_bucket"
+    create_bucket(bucket)
+
+    settings = construct_sample_settings()
+    job_metadata = JobMetadata(
+        job_id="job_1",
+        max_elapsed_s=10,
+        sdk_version="0.0.0",
+        token="token1",  # noqa: S106
+        role="admin",
+        requested_backend=settings.backend,
+        n_shots=settings.n_shots,
+        save_job=False,
+    )
+
+    job_repository = JobRepository(
+        bucket_name=bucket,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+    )
+    mocker.patch.object(
+        job_repository.s3,
+        "put_object",
+        side_effect=ClientError(error_response={"Error": {"Code": "500"}}, operation_name="PutObject"),
+    )
+
+    with pytest.raises(ClientError):
+        job_repository.upload_job_input(program=construct_sample_program(), job_metadata=job_metadata)
+
+
 @mock_aws
 def test_download_job_input() -> None:
     """Test downloading job input from S3."""
@@ -218,3 +351,80 @@ def test_download_job_input() -> None:
     assert downloaded_program == compiled_circuit
 
     assert job_repository.download_job_input(job_id="invalid job id") is None
+
+
+@mock_aws
+def test_download_compressed_job_input() -> None:
+    """Test downloading job input compressed with gzip from S3."""
+    bucket = "test_bucket"
+    create_bucket(bucket)
+
+    job_id = "job_1"
+    compiled_circuit = construct_sample_program()
+    client = boto3.client("s3", region_name=SAMPLE_AWS_CREDENTIALS.region_name)
+    client.put_object(
+        Bucket=bucket, Key=f"{job_id}.in.proto.gz", Body=gzip.compress(compiled_circuit.SerializeToString())
+    )
+
+    job_repository = JobRepository(
+        bucket_name=bucket,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+    )
+
+    assert job_repository.download_job_input(job_id=job_id) == compiled_circuit
+
+
+@mock_aws
+@pytest.mark.parametrize(
+    ("key", "body"),
+    [
+        ("job_1.in.proto.gz", b"not compressed with gzip"),
+        ("job_1.in.proto.gz", gzip.compress(b"truncated input")[:10]),
+        ("job_1.in.proto", b"\x0a\xff"),
+        ("job_1.in.proto.gz", gzip.compress(b"\x0a\xff")),
+    ],
+)
+def test_download_corrupt_job_input(key: str, body: bytes) -> None:
+    """Test that downloading job input that cannot be decompressed or parsed returns None."""
+    bucket = "test_bucket"
+    create_bucket(bucket)
+
+    client = boto3.client("s3", region_name=SAMPLE_AWS_CREDENTIALS.region_name)
+    client.put_object(Bucket=bucket, Key=key, Body=body)
+
+    job_repository = JobRepository(
+        bucket_name=bucket,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+    )
+
+    assert job_repository.download_job_input(job_id="job_1") is None
+
+
+@mock_aws
+def test_download_job_input_in_chunks(mocker: MockerFixture) -> None:
+    """Test downloading job input from S3 in chunks smaller than the object."""
+    mocker.patch("job_manager.job_repository.DOWNLOAD_CHUNK_SIZE", 7)
+    bucket = "test_bucket"
+    create_bucket(bucket)
+
+    job_id = "job_1"
+    compiled_circuit = construct_sample_program()
+    settings = construct_sample_settings()
+    job_metadata = JobMetadata(
+        job_id=job_id,
+        max_elapsed_s=10,
+        sdk_version="0.0.0",
+        token="token1",  # noqa: S106
+        role="admin",
+        requested_backend=settings.backend,
+        n_shots=settings.n_shots,
+        save_job=False,
+    )
+
+    job_repository = JobRepository(
+        bucket_name=bucket,
+        aws_credentials=SAMPLE_AWS_CREDENTIALS,
+    )
+    job_repository.upload_job_input(program=compiled_circuit, job_metadata=job_metadata)
+
+    assert job_repository.download_job_input(job_id=job_id) == compiled_circuit
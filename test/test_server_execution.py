@@ -84,7 +84,7 @@ def test_assign_next_job_success(mocker) -> None:  # noqa: ANN001, PLR0914
     request = execution_pb2.AssignNextJobRequest(backend=backend)
     response = server.AssignNextJob(request, context)
 
-    patch_fetch_next_job.assert_called_once_with(request)
+    patch_fetch_next_job.assert_called_once_with(request, queue_lock=server.job_manager_lock)
     assert response.error == error_detail_pb2.ErrorDetail()
     assert response.job_id == mock_metadata.job_id
     assert response.job == job
@@ -129,7 +129,7 @@ def test_assign_next_job_no_job(mocker) -> None:  # noqa: ANN001
     request = execution_pb2.AssignNextJobRequest(backend=backend)
     response = server.AssignNextJob(request, context)
 
-    patch_fetch_next_job.assert_called_once_with(request)
+    patch_fetch_next_job.assert_called_once_with(request, queue_lock=server.job_manager_lock)
     assert response == execution_pb2.AssignNextJobResponse()
 
 
@@ -138,7 +138,6 @@ def test_submit_job_success(mocker, verify_token_success) -> None:  # noqa: ANN0
     server = SubmissionServer(
         address_to_token_database=ADDRESS_TOKEN_DB,
         backend_manager=backend_manager,
-        backend_manager_lock=threading.RLock(),
         job_manager=job_manager,
         job_manager_lock=threading.RLock(),
         max_job_bytes=MAX_JOB_BYTES,
@@ -196,7 +195,6 @@ def test_get_job_status_success(mocker, verify_token_success) -> None:  # noqa:
     server = SubmissionServer(
         address_to_token_database=ADDRESS_TOKEN_DB,
         backend_manager=backend_manager,
-        backend_manager_lock=threading.RLock(),
         job_manager=job_manager,
         job_manager_lock=threading.RLock(),
         max_job_bytes=MAX_JOB_BYTES,
@@ -262,7 +260,6 @@ def test_get_job_result_success(mocker, verify_token_success) -> None:  # noqa:
     server = SubmissionServer(
         address_to_token_database=ADDRESS_TOKEN_DB,
         backend_manager=backend_manager,
-        backend_manager_lock=threading.RLock(),
         job_manager=job_manager,
         job_manager_lock=threading.RLock(),
         max_job_bytes=MAX_JOB_BYTES,
@@ -323,7 +320,6 @@ def test_get_service_status_success(mocker, verify_token_success) -> None:  # no
     server = SubmissionServer(
         address_to_token_database=ADDRESS_TOKEN_DB,
         backend_manager=backend_manager,
-        backend_manager_lock=threading.RLock(),
         job_manager=job_manager,
         job_manager_lock=threading.RLock(),
         max_job_bytes=MAX_JOB_BYTES,
@@ -373,7 +369,6 @@ def test_cancel_job(mocker, verify_token_success) -> None:  # noqa: ANN001, ARG0
     server = SubmissionServer(
         address_to_token_database=ADDRESS_TOKEN_DB,
         backend_manager=backend_manager,
-        backend_manager_lock=threading.RLock(),
         job_manager=job_manager,
         job_manager_lock=threading.RLock(),
         max_job_bytes=MAX_JOB_BYTES,
@@ -418,7 +413,6 @@ def test_resolve_service_status_failed():
     server = SubmissionServer(
         address_to_token_database=ADDRESS_TOKEN_DB,
         backend_manager=backend_manager,
-        backend_manager_lock=threading.RLock(),
         job_manager=job_manager,
         job_manager_lock=threading.RLock(),
         max_job_bytes=MAX_JOB_BYTES,